@@ -1,9 +1,14 @@
-from langchain_openai import ChatOpenAI
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Models come from the shared registry in the parent folder (05-LangChainModels)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from provider_factory import get_chat_model
+
 load_dotenv()
 
-model = ChatOpenAI(model='gpt-4', temperature=0, max_completion_tokens=50)
+model = get_chat_model("openai", model='gpt-4', temperature=0, max_completion_tokens=50)
 result = model.invoke(
     "Suggest me 5 Top Malaysia places for family tour in September, also suggest cheap flights and hotels.")
 print(result.content)
@@ -1,9 +1,14 @@
-from langchain_anthropic import ChatAnthropic
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Models come from the shared registry in the parent folder (05-LangChainModels)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from provider_factory import get_chat_model
+
 load_dotenv()
 
-model = ChatAnthropic(model='claude-sonnet-4-5-20250929')
+model = get_chat_model("anthropic", model='claude-sonnet-4-5-20250929')
 
 result = model.invoke("What is the capital of Thailand?")
 print(result.content)
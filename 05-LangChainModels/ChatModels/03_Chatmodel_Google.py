@@ -1,12 +1,17 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 import pprint  # This is not strictly necessary for this specific example but is fine to keep
 
+# Models come from the shared registry in the parent folder (05-LangChainModels)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from provider_factory import get_chat_model
+
 # 1. Load the API key from the .env file into the environment (GEMINI_API_KEY)
 load_dotenv()
 
 # 2. Initialize the model. It automatically finds the GEMINI_API_KEY environment variable.
-model = ChatGoogleGenerativeAI(model='models/gemini-2.5-flash')
+model = get_chat_model("google", model='models/gemini-2.5-flash')
 
 # 3. Invoke the model
 result = model.invoke("What is the capital of Pakistan?")
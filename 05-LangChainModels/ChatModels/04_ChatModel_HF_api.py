@@ -1,13 +1,14 @@
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Models come from the shared registry in the parent folder (05-LangChainModels)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from provider_factory import get_chat_model
+
 load_dotenv()
 
-llm = HuggingFaceEndpoint(
-    repo_id="meta-llama/Llama-3.1-8B-Instruct",
-    task="text-generation"
-)
-model = ChatHuggingFace(llm=llm)
+model = get_chat_model("huggingface", repo_id="meta-llama/Llama-3.1-8B-Instruct", task="text-generation")
 result = model.invoke("What is the capital of Pakistan?")
 
 print(result.content)
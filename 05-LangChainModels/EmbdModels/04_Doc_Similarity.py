@@ -1,6 +1,5 @@
 from langchain_openai import OpenAIEmbeddings
 from dotenv import load_dotenv
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
 load_dotenv()
@@ -19,7 +18,10 @@ query = "Tell me about which city of Vietnam is home to UNESCO-listed Citadel?"
 doc_emb = embedding.embed_documents(documents)
 query_emb = embedding.embed_query(query)
 
-cosine_sim = cosine_similarity([query_emb], doc_emb)[0]
+# Plain numpy cosine similarity: importing scikit-learn for one call costs more than the call itself
+doc_matrix = np.array(doc_emb)
+query_vec = np.array(query_emb)
+cosine_sim = doc_matrix @ query_vec / (np.linalg.norm(doc_matrix, axis=1) * np.linalg.norm(query_vec))
 # print(sorted(list(enumerate(cosine_sim)), key=lambda x: x[1])[-1])
 index, score = sorted(list(enumerate(cosine_sim)), key=lambda x: x[1])[-1]
 
@@ -0,0 +1,185 @@
+import asyncio
+import importlib
+import json
+import threading
+import weakref
+from typing import Any, Dict
+
+
+# NOTE: Provider packages (and everything they pull in) are imported only when a client of
+# that provider is first requested, and every client is built once per process.
+# Clients are shared per (provider, model, parameters) across chains and threads, and the
+# providers that accept an httpx client (OpenAI chat / embeddings) share one pooled,
+# keep-alive transport, so connections and TLS sessions are reused. Async connections belong
+# to the event loop that opened them, so the async transport keeps one pool per event loop.
+# Usage: model = get_chat_model("openai", model="gpt-4o", temperature=0.0)
+
+CHAT_PROVIDERS = {
+    "openai": "langchain_openai.ChatOpenAI",
+    "anthropic": "langchain_anthropic.ChatAnthropic",
+    "google": "langchain_google_genai.ChatGoogleGenerativeAI",
+    "huggingface": "langchain_huggingface.HuggingFaceEndpoint",
+}
+
+EMBEDDING_PROVIDERS = {
+    "openai": "langchain_openai.OpenAIEmbeddings",
+    "huggingface": "langchain_huggingface.HuggingFaceEmbeddings",
+}
+
+# Size of the shared connection pool; change with configure_http_pool() before building clients
+HTTP_POOL_SETTINGS = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+}
+
+_lock = threading.Lock()
+_clients: Dict[str, Any] = {}
+_http_clients: Dict[str, Any] = {}
+
+
+def _import_class(path: str):
+    module_name, _, class_name = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def configure_http_pool(**settings):
+    """
+    Changes the pool size / keep-alive of the shared transport, e.g. configure_http_pool(max_connections=200).
+    The previous pool is closed and the cached clients are dropped, so they are rebuilt on the new pool.
+    """
+    unknown = set(settings) - set(HTTP_POOL_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown pool settings: {sorted(unknown)}")
+    with _lock:
+        HTTP_POOL_SETTINGS.update(settings)
+        _clients.clear()
+        _close_http_clients()
+
+
+def _loop_local_async_client(**kwargs):
+    import httpx
+
+    class LoopLocalAsyncClient(httpx.AsyncClient):
+        """
+        AsyncClient that sends every request through a pool of the running event loop. A pool
+        opened on one loop fails on the next asyncio.run() ("Event loop is closed").
+        """
+
+        def __init__(self):
+            super().__init__(**kwargs)
+            self._pools = weakref.WeakKeyDictionary()
+            self._pools_lock = threading.Lock()
+
+        def _pool(self) -> httpx.AsyncClient:
+            loop = asyncio.get_running_loop()
+            with self._pools_lock:
+                pool = self._pools.get(loop)
+                if pool is None:
+                    pool = self._pools[loop] = httpx.AsyncClient(**kwargs)
+                return pool
+
+        async def send(self, request, **send_kwargs):
+            return await self._pool().send(request, **send_kwargs)
+
+        async def aclose(self):
+            with self._pools_lock:
+                pool = self._pools.pop(asyncio.get_running_loop(), None)
+            if pool is not None:
+                await pool.aclose()
+            await super().aclose()
+
+        def close_pools(self):
+            # Pools of finished loops hold no live connections; open loops close theirs themselves
+            with self._pools_lock:
+                pools, self._pools = list(self._pools.items()), weakref.WeakKeyDictionary()
+            for loop, pool in pools:
+                if loop.is_closed():
+                    continue
+                if loop.is_running():
+                    asyncio.run_coroutine_threadsafe(pool.aclose(), loop)
+                else:
+                    loop.run_until_complete(pool.aclose())
+
+    return LoopLocalAsyncClient()
+
+
+def _pooled_http_clients() -> Dict[str, Any]:
+    # Called with _lock held
+    if not _http_clients:
+        import httpx
+
+        limits = httpx.Limits(**HTTP_POOL_SETTINGS)
+        _http_clients["http_client"] = httpx.Client(limits=limits)
+        _http_clients["http_async_client"] = _loop_local_async_client(limits=limits)
+    return _http_clients
+
+
+def _close_http_clients():
+    # Called with _lock held
+    for client in _http_clients.values():
+        if hasattr(client, "close_pools"):
+            client.close_pools()
+        else:
+            client.close()
+    _http_clients.clear()
+
+
+def _with_pooled_transport(cls, params: Dict[str, Any]) -> Dict[str, Any]:
+    fields = getattr(cls, "model_fields", {})
+    injectable = [name for name in ("http_client", "http_async_client") if name in fields and name not in params]
+    if not injectable:
+        return params
+    pooled = _pooled_http_clients()
+    return {**params, **{name: pooled[name] for name in injectable}}
+
+
+def _client_key(kind: str, provider: str, params: Dict[str, Any]) -> str:
+    return f"{kind}:{provider}:{json.dumps(params, sort_keys=True, default=repr)}"
+
+
+def _get_or_build(kind: str, providers: Dict[str, str], provider: str, params: Dict[str, Any], build):
+    if provider not in providers:
+        raise ValueError(f"Unknown {kind} provider '{provider}'. Available: {sorted(providers)}")
+    key = _client_key(kind, provider, params)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            cls = _import_class(providers[provider])
+            client = build(cls, _with_pooled_transport(cls, params))
+            _clients[key] = client
+        return client
+
+
+def _build_chat_model(cls, params: Dict[str, Any]):
+    if cls.__name__ == "HuggingFaceEndpoint":
+        chat_cls = _import_class("langchain_huggingface.ChatHuggingFace")
+        return chat_cls(llm=cls(**params))
+    return cls(**params)
+
+
+def get_chat_model(provider: str, **params):
+    """
+    Returns the chat model of a provider ("openai", "anthropic", "google", "huggingface"),
+    importing the provider package and constructing the client on first use.
+    """
+    return _get_or_build("chat", CHAT_PROVIDERS, provider, params, _build_chat_model)
+
+
+def get_embeddings(provider: str, **params):
+    """
+    Returns the embeddings client of a provider ("openai", "huggingface"), built on first use.
+    """
+    return _get_or_build("embeddings", EMBEDDING_PROVIDERS, provider, params, lambda cls, kwargs: cls(**kwargs))
+
+
+def registry_info() -> Dict[str, Any]:
+    with _lock:
+        return {"clients": sorted(_clients), "http_pool": dict(HTTP_POOL_SETTINGS),
+                "pooled_transport": bool(_http_clients)}
+
+
+def clear_clients():
+    with _lock:
+        _clients.clear()
+        _close_http_clients()
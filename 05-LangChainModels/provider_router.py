@@ -0,0 +1,302 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.config import patch_config
+
+
+# NOTE: Latency-aware routing across chat providers.
+# - Every provider keeps a rolling window of latencies and errors (p95 and error rate).
+# - The primary is picked at random, weighted by observed latency, error rate and cost.
+# - If the primary has not answered within its own p95, a hedged duplicate goes to the next
+#   best provider; the first answer wins and the other request is cancelled.
+# - Errors fail over to the next provider.
+# Real providers: ProviderRouter({"openai": get_chat_model("openai"), "anthropic": ...})
+# Local testing:  ProviderRouter({"fast": ScriptedChatModel("fast", [0.1, 0.2]), ...})
+
+class ProviderStats:
+    def __init__(self, window: int = 100, initial_p95: float = 2.0, min_samples: int = 5):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.initial_p95 = initial_p95
+        self.min_samples = min_samples
+        self.counts = {"requests": 0, "wins": 0, "errors": 0, "cancelled": 0}
+
+    def record(self, latency: float, ok: bool):
+        self.latencies.append(latency)
+        self.outcomes.append(ok)
+
+    def p95(self) -> float:
+        if len(self.latencies) < self.min_samples:
+            return self.initial_p95
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+
+class ProviderRouter(Runnable):
+    """
+    providers        -> {name: chat model with invoke() / ainvoke()}
+    costs            -> relative cost per call of each provider (default 1.0)
+    cost_weight      -> how strongly cost influences routing (0 = latency only)
+    hedge            -> send a duplicate request when the primary exceeds its p95
+    min_hedge_delay  -> never hedge earlier than this (seconds)
+    invoke() runs the provider calls on worker threads (their own sync invoke, so no event loop is
+    created per call); a losing request cannot be interrupted there and finishes in the background,
+    its answer ignored. ainvoke() cancels the losing request.
+    """
+
+    def __init__(self, providers: Dict[str, Any], costs: Optional[Dict[str, float]] = None,
+                 cost_weight: float = 1.0, hedge: bool = True, min_hedge_delay: float = 0.05,
+                 window: int = 100, initial_p95: float = 2.0, seed: Optional[int] = None):
+        if not providers:
+            raise ValueError("ProviderRouter needs at least one provider")
+        self.providers = providers
+        self.costs = {name: (costs or {}).get(name, 1.0) for name in providers}
+        self.cost_weight = cost_weight
+        self.hedge = hedge
+        self.min_hedge_delay = min_hedge_delay
+        self.stats = {name: ProviderStats(window, initial_p95) for name in providers}
+        self.counts = {"requests": 0, "hedged": 0, "hedge_wins": 0, "failovers": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def score(self, name: str) -> float:
+        """Lower is better: p95 latency, penalized by error rate and cost."""
+        stats = self.stats[name]
+        return stats.p95() * (1.0 + 4.0 * stats.error_rate()) * self.costs[name] ** self.cost_weight
+
+    def routing_order(self) -> List[str]:
+        """
+        Primary chosen at random with weight 1/score (slow providers still get some traffic,
+        which keeps their statistics fresh); the rest ordered by score for hedging / failover.
+        """
+        with self._lock:
+            names = list(self.providers)
+            scores = {name: self.score(name) for name in names}
+            primary = self._random.choices(names, weights=[1.0 / max(scores[n], 1e-6) for n in names])[0]
+        return [primary] + sorted((n for n in names if n != primary), key=scores.get)
+
+    def invoke(self, input: Any, config=None, **kwargs) -> Any:
+        return self._call_with_config(self._invoke, input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config=None, **kwargs) -> Any:
+        return await self._acall_with_config(self._ainvoke, input, config, **kwargs)
+
+    # --- Routing: the same loop over threads (invoke) and asyncio tasks (ainvoke) ---
+    def _invoke(self, input_data: Any, run_manager, config) -> Any:
+        order = self._start_request()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="provider-router")
+        started: Dict[Future, tuple] = {}
+
+        def launch(name: str) -> Future:
+            future = self._executor.submit(self.providers[name].invoke, input_data,
+                                           self._child_config(config, run_manager, name))
+            started[future] = (name, time.monotonic())
+            self._count_launch(name)
+            return future
+
+        pending = {launch(order[0])}
+        next_index = 1
+        hedge_delay = max(self.stats[order[0]].p95(), self.min_hedge_delay)
+        last_error: Optional[BaseException] = None
+        hedged = False
+
+        try:
+            while pending:
+                timeout = hedge_delay if (self.hedge and next_index == 1 and len(order) > 1) else None
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Primary is slower than its p95: hedge with the next best provider
+                    pending.add(launch(order[next_index]))
+                    next_index += 1
+                    hedged = True
+                    self._count_hedge()
+                    continue
+                for future in done:
+                    name, future_started = started[future]
+                    if future.exception() is None:
+                        self._record_win(name, future_started, hedged and name != order[0])
+                        return future.result()
+                    last_error = future.exception()
+                    self._record_error(name, future_started)
+                if not pending and next_index < len(order):
+                    pending.add(launch(order[next_index]))
+                    next_index += 1
+                    self._count_failover()
+            raise last_error
+        finally:
+            for future in pending:
+                future.cancel()
+                self._record_cancelled(*started[future])
+
+    async def _ainvoke(self, input_data: Any, run_manager, config) -> Any:
+        order = self._start_request()
+        started: Dict[asyncio.Task, tuple] = {}
+
+        def launch(name: str):
+            task = asyncio.create_task(self.providers[name].ainvoke(
+                input_data, self._child_config(config, run_manager, name)))
+            started[task] = (name, time.monotonic())
+            self._count_launch(name)
+            return task
+
+        pending = {launch(order[0])}
+        next_index = 1
+        hedge_delay = max(self.stats[order[0]].p95(), self.min_hedge_delay)
+        last_error: Optional[BaseException] = None
+        hedged = False
+
+        try:
+            while pending:
+                timeout = hedge_delay if (self.hedge and next_index == 1 and len(order) > 1) else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary is slower than its p95: hedge with the next best provider
+                    pending.add(launch(order[next_index]))
+                    next_index += 1
+                    hedged = True
+                    self._count_hedge()
+                    continue
+                for task in done:
+                    name, task_started = started[task]
+                    if task.exception() is None:
+                        self._record_win(name, task_started, hedged and name != order[0])
+                        return task.result()
+                    last_error = task.exception()
+                    self._record_error(name, task_started)
+                if not pending and next_index < len(order):
+                    # Every in-flight request failed: fail over to the next provider
+                    pending.add(launch(order[next_index]))
+                    next_index += 1
+                    self._count_failover()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+                self._record_cancelled(*started[task])
+
+    # --- Bookkeeping ---
+    @staticmethod
+    def _child_config(config, run_manager, name: str):
+        # Tagged like the branches of a RunnableParallel, so traces keep the providers apart
+        return patch_config(config, callbacks=run_manager.get_child(f"map:key:{name}"))
+
+    def _start_request(self) -> List[str]:
+        order = self.routing_order()
+        with self._lock:
+            self.counts["requests"] += 1
+        return order
+
+    def _count_launch(self, name: str):
+        with self._lock:
+            self.stats[name].counts["requests"] += 1
+
+    def _count_hedge(self):
+        with self._lock:
+            self.counts["hedged"] += 1
+
+    def _count_failover(self):
+        with self._lock:
+            self.counts["failovers"] += 1
+
+    def _record_win(self, name: str, started: float, hedge_win: bool):
+        with self._lock:
+            self.stats[name].record(time.monotonic() - started, ok=True)
+            self.stats[name].counts["wins"] += 1
+            if hedge_win:
+                self.counts["hedge_wins"] += 1
+
+    def _record_error(self, name: str, started: float):
+        with self._lock:
+            self.stats[name].record(time.monotonic() - started, ok=False)
+            self.stats[name].counts["errors"] += 1
+
+    def _record_cancelled(self, name: str, started: float):
+        with self._lock:
+            stats = self.stats[name]
+            # Censored sample: the cancelled request would have taken at least this long, so
+            # it must not pull the p95 down (a hedge loser cancelled early is not a fast answer)
+            stats.record(max(time.monotonic() - started, stats.p95()), ok=True)
+            stats.counts["cancelled"] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = {
+                name: dict(stats.counts, p95_s=round(stats.p95(), 3), error_rate=round(stats.error_rate(), 3))
+                for name, stats in self.stats.items()
+            }
+            return dict(self.counts, providers=providers)
+
+
+class ScriptedChatModel:
+    """
+    Local fake provider with scripted latency: every call sleeps for the next value of the
+    script (cycled); a None entry makes that call fail.
+    """
+
+    def __init__(self, name: str, latencies: Iterable[Optional[float]]):
+        self.name = name
+        self._script = itertools.cycle(list(latencies))
+        self._lock = threading.Lock()
+
+    def _next_latency(self) -> float:
+        with self._lock:
+            latency = next(self._script)
+        if latency is None:
+            raise RuntimeError(f"{self.name}: scripted failure")
+        return latency
+
+    async def ainvoke(self, input_data: Any, config=None) -> AIMessage:
+        try:
+            latency = self._next_latency()
+        except RuntimeError:
+            await asyncio.sleep(0.01)
+            raise
+        await asyncio.sleep(latency)
+        return AIMessage(content=f"[{self.name}] answer to: {input_data}")
+
+    def invoke(self, input_data: Any, config=None) -> AIMessage:
+        try:
+            latency = self._next_latency()
+        except RuntimeError:
+            time.sleep(0.01)
+            raise
+        time.sleep(latency)
+        return AIMessage(content=f"[{self.name}] answer to: {input_data}")
+
+
+if __name__ == "__main__":
+    # Simulation with local fake providers: "claude" has a slow tail, "google" fails now and then
+    router = ProviderRouter(
+        {
+            "openai": ScriptedChatModel("openai", [0.20, 0.25, 0.22, 0.21, 0.24]),
+            "claude": ScriptedChatModel("claude", [0.15, 0.18, 1.50, 0.16, 0.17]),
+            "google": ScriptedChatModel("google", [0.30, None, 0.28, 0.31, 0.29]),
+        },
+        costs={"openai": 1.0, "claude": 1.2, "google": 0.6},
+        initial_p95=0.5,
+        seed=7,
+    )
+
+    latencies = []
+    for i in range(40):
+        start = time.monotonic()
+        router.invoke(f"question {i}")
+        latencies.append(time.monotonic() - start)
+
+    latencies.sort()
+    print(f"p50: {latencies[len(latencies) // 2]:.3f}s  p95: {latencies[int(0.95 * len(latencies))]:.3f}s")
+    print(router.get_metrics())
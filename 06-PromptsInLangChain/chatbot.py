@@ -1,10 +1,17 @@
-from langchain_openai import ChatOpenAI
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from dotenv import load_dotenv
+from semantic_cache import SemanticCache, CachedChatModel
 
 load_dotenv()
 model = ChatOpenAI()
 
+# Near-duplicate opening questions are answered from the cache instead of calling the model again;
+# follow-ups depend on the conversation so far and always go to the model.
+# For a local embedding model use HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2").
+cache = SemanticCache(OpenAIEmbeddings(model='text-embedding-3-small'), threshold=0.92, ttl_seconds=3600)
+cached_model = CachedChatModel(model, cache)
+
 chat_history = [
     SystemMessage(content='You are a help AI Assistant')
 ]
@@ -14,7 +21,9 @@ while True:
     chat_history.append(HumanMessage(content=user_input))
     if user_input == 'exit':
         break
-    result = model.invoke(chat_history)
+    result = cached_model.invoke(chat_history)
     chat_history.append(AIMessage(content=result.content))
     print("AI", result.content)
+    if 'semantic_cache' in result.response_metadata:
+        print(f"(cached answer, similarity {result.response_metadata['semantic_cache']['similarity']:.3f})")
 print(chat_history)
@@ -6,6 +6,14 @@ from langchain_core.prompts import PromptTemplate, load_prompt
 load_dotenv()
 model = ChatOpenAI()
 
+
+@st.cache_resource
+def get_response_cache():
+    # Streamlit re-runs the script on every interaction, so the cache lives in a cached resource.
+    # Every input is a selectbox, so the selected values are an exact key (at most 48 entries).
+    return {}
+
+
 st.header('Research AI Tool')
 # user_input = st.text_input('Enter Your Prompt')
 paper_input = st.selectbox("Select Research Paper Name",
@@ -20,6 +28,13 @@ length_input = st.selectbox("Select Explanation Length",
 template = load_prompt('template.json')
 
 if st.button('Summarize'):
-    chain = template | model
-    result = chain.invoke({'paper_input': paper_input, 'style_input': style_input, 'length_input': length_input})
-    st.write(result.content)
+    responses = get_response_cache()
+    key = (paper_input, style_input, length_input)
+    cached = key in responses
+    if not cached:
+        chain = template | model
+        result = chain.invoke({'paper_input': paper_input, 'style_input': style_input, 'length_input': length_input})
+        responses[key] = result.content
+    st.write(responses[key])
+    if cached:
+        st.caption("Served from cache")
@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+from langchain_core.messages import AIMessage, HumanMessage
+
+
+# NOTE: In-process semantic cache. Prompts are embedded (OpenAIEmbeddings or a local
+# HuggingFaceEmbeddings) and kept as normalized rows of one numpy matrix, so a lookup is a
+# single matrix-vector product. Entries are evicted LRU-first and optionally expire (TTL).
+
+class SemanticCache:
+    """
+    threshold   -> minimum cosine similarity for a hit (0.0 - 1.0)
+    max_entries -> LRU capacity
+    ttl_seconds -> entries older than this are ignored and dropped (None = never expire)
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.92, max_entries: int = 1000,
+                 ttl_seconds: Optional[float] = None):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        # (prompt, matched prompt, similarity) of every hit, most recent last
+        self.hit_log = deque(maxlen=10_000)
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        # slot -> (prompt, completion, created_at); order = LRU order
+        self._entries: "OrderedDict[int, Tuple[str, Any, float]]" = OrderedDict()
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+
+    def embed(self, prompt: str) -> np.ndarray:
+        """Normalized embedding of a prompt; pass it to lookup() and update() to embed only once."""
+        vector = np.asarray(self.embeddings.embed_query(prompt), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, prompt: str, vector: Optional[np.ndarray] = None) -> Optional[Tuple[Any, float]]:
+        """
+        Returns (cached completion, similarity) for the most similar cached prompt, or None on a miss.
+        """
+        query = self.embed(prompt) if vector is None else vector
+        with self._lock:
+            if not self._entries:
+                self.stats["misses"] += 1
+                return None
+            scores = self._vectors @ query
+            scores[~self._valid] = -np.inf
+            slot = int(np.argmax(scores))
+            score = min(float(scores[slot]), 1.0)
+            if score < self.threshold:
+                self.stats["misses"] += 1
+                return None
+            cached_prompt, completion, created_at = self._entries[slot]
+            if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+                self._remove(slot)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(slot)
+            self.stats["hits"] += 1
+            self.hit_log.append((prompt, cached_prompt, score))
+            return completion, score
+
+    def update(self, prompt: str, completion: Any, vector: Optional[np.ndarray] = None):
+        if vector is None:
+            vector = self.embed(prompt)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            if not self._free_slots:
+                oldest_slot = next(iter(self._entries))
+                self._remove(oldest_slot)
+                self.stats["evictions"] += 1
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._valid[slot] = True
+            self._entries[slot] = (prompt, completion, time.time())
+
+    def _remove(self, slot: int):
+        del self._entries[slot]
+        self._valid[slot] = False
+        self._free_slots.append(slot)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def prompt_text(input_data: Any) -> Optional[str]:
+    """
+    Cache key of a model input: the text of a prompt, or the human message of a chat history that
+    has no earlier turns. A follow-up question depends on the conversation before it, so histories
+    with earlier turns return None and are not cached.
+    """
+    if isinstance(input_data, str):
+        return input_data
+    if hasattr(input_data, "to_messages"):
+        input_data = input_data.to_messages()
+    if isinstance(input_data, list):
+        turns = [message for message in input_data if isinstance(message, (HumanMessage, AIMessage))]
+        if len(turns) == 1 and isinstance(turns[0], HumanMessage):
+            return turns[0].content
+        return None
+    return str(input_data)
+
+
+class CachedChatModel:
+    """
+    Wraps a chat model with a SemanticCache. A hit returns an AIMessage whose
+    response_metadata["semantic_cache"]["similarity"] holds the similarity score.
+    Inputs for which key_fn returns None go straight to the model.
+    """
+
+    def __init__(self, model, cache: SemanticCache, key_fn: Callable[[Any], Optional[str]] = prompt_text):
+        self.model = model
+        self.cache = cache
+        self.key_fn = key_fn
+
+    def invoke(self, input_data: Any) -> AIMessage:
+        key = self.key_fn(input_data)
+        if key is None:
+            return self.model.invoke(input_data)
+        vector = self.cache.embed(key)
+        hit = self.cache.lookup(key, vector)
+        if hit is not None:
+            content, score = hit
+            return AIMessage(content=content, response_metadata={"semantic_cache": {"similarity": score}})
+        result = self.model.invoke(input_data)
+        self.cache.update(key, result.content, vector)
+        return result
+
+    def as_runnable(self):
+        """For use inside chains: template | cached_model.as_runnable()"""
+        from langchain_core.runnables import RunnableLambda
+        return RunnableLambda(self.invoke)
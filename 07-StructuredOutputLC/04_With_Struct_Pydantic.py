@@ -1,5 +1,6 @@
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from schema_cache import get_structured_model
 from typing import TypedDict, Annotated, Optional, Literal
 from pydantic import BaseModel, EmailStr, Field
 
@@ -21,7 +22,8 @@ class Review(BaseModel):
     review_name: str = Field(description="The name of the reviewer, if available.")
 
 
-struct_model = model.with_structured_output(Review)
+# Schema conversion happens once per process; later calls reuse the bound structured model
+struct_model = get_structured_model(model, Review)
 
 result = struct_model.invoke("""The Samsung Galaxy S24 Ultra has been universally acclaimed by tech publications (PCMag, GSMArena, Android Authority, TechRadar) as the most powerful and feature-complete Android flagship available. While it looks similar to its predecessor, its key upgrades—particularly the performance boost, the new anti-reflective display, and the massive focus on Galaxy AI—cement its status as the top-tier "Ultra" device.
 Core Upgrades and Experience
@@ -0,0 +1,159 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, get_type_hints
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel, PydanticUserError, TypeAdapter, create_model
+from typing_extensions import is_typeddict
+
+
+# NOTE: Process-wide cache. TypedDict / Pydantic schemas are keyed by the class itself (identity),
+# raw JSON schemas by their canonical JSON text. Each schema is converted to a function definition
+# and a compiled validator once; structured models are bound from those compiled parts, so a new
+# model instance (e.g. one per request with other settings) does not convert the schema again.
+# Bound models are kept in an LRU, so long-running processes stay bounded.
+
+class CompiledSchema(NamedTuple):
+    """Everything derived from a schema: the tool definition and a compiled validator."""
+    schema: Any
+    tool: Dict[str, Any]
+    validate: Callable[[Any], Any]
+
+
+MAX_BOUND_MODELS = 128
+
+_lock = threading.Lock()
+_compiled: Dict[Any, CompiledSchema] = {}
+_bound_models: "OrderedDict[tuple, tuple]" = OrderedDict()
+_stats = {"compile_hits": 0, "compile_misses": 0, "bind_hits": 0, "bind_misses": 0, "bind_evictions": 0}
+
+
+def schema_key(schema: Any) -> Any:
+    """
+    Cache key of a schema: the class for TypedDict / Pydantic, canonical JSON for dict schemas.
+    """
+    if isinstance(schema, dict):
+        return "json:" + json.dumps(schema, sort_keys=True)
+    return schema
+
+
+def _build_validator(schema: Any) -> Callable[[Any], Any]:
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        return schema.model_validate
+    if is_typeddict(schema):
+        try:
+            return TypeAdapter(schema).validate_python
+        except PydanticUserError:
+            return _typeddict_validator(schema)
+    if isinstance(schema, dict):
+        try:
+            from jsonschema.validators import validator_for
+        except ImportError:
+            # Without jsonschema only the required keys are checked
+            required = tuple(schema.get("required", ()))
+
+            def validate_required(data):
+                missing = [key for key in required if key not in data]
+                if missing:
+                    raise ValueError(f"Missing required keys: {missing}")
+                return data
+
+            return validate_required
+        validator = validator_for(schema)(schema)
+
+        def validate_json(data):
+            validator.validate(data)
+            return data
+
+        return validate_json
+    raise TypeError(f"Unsupported schema type: {type(schema)!r}")
+
+
+def _typeddict_validator(schema: Any) -> Callable[[Any], Any]:
+    # Pydantic refuses typing.TypedDict before Python 3.12, so build an equivalent model once instead
+    hints = get_type_hints(schema, include_extras=True)
+    required = getattr(schema, "__required_keys__", frozenset(hints))
+    fields = {name: (hint, ... if name in required else None) for name, hint in hints.items()}
+    model = create_model(schema.__name__, **fields)
+
+    def validate_typeddict(data):
+        return model.model_validate(data).model_dump(exclude_unset=True)
+
+    return validate_typeddict
+
+
+def compile_schema(schema: Any) -> CompiledSchema:
+    """
+    Returns the cached tool definition and validator for a schema, building them on first use.
+    """
+    key = schema_key(schema)
+    with _lock:
+        compiled = _compiled.get(key)
+        if compiled is not None:
+            _stats["compile_hits"] += 1
+            return compiled
+    compiled = CompiledSchema(schema, convert_to_openai_tool(schema), _build_validator(schema))
+    with _lock:
+        _stats["compile_misses"] += 1
+        return _compiled.setdefault(key, compiled)
+
+
+def validate(schema: Any, data: Any) -> Any:
+    """Validates data with the cached validator of the schema."""
+    return compile_schema(schema).validate(data)
+
+
+def _bind(model, compiled: CompiledSchema, kwargs: Dict[str, Any]):
+    from langchain_core.runnables import RunnableLambda
+
+    # The provider receives the precompiled function definition (no schema conversion) and
+    # returns a dict, which the compiled validator turns into the schema's type
+    structured = model.with_structured_output(compiled.tool["function"], **kwargs)
+    if kwargs.get("include_raw"):
+        def validate_parsed(output):
+            if output.get("parsed") is not None:
+                output = dict(output, parsed=compiled.validate(output["parsed"]))
+            return output
+
+        return structured | RunnableLambda(validate_parsed)
+    return structured | RunnableLambda(compiled.validate)
+
+
+def get_structured_model(model, schema: Any, **kwargs):
+    """
+    Cached equivalent of model.with_structured_output(schema, **kwargs): returns instances of a
+    Pydantic schema and dicts for TypedDict / JSON schemas, validated by the compiled validator.
+    The bound model is reused for every call with the same model instance, schema and options.
+    """
+    compiled = compile_schema(schema)
+    key = (id(model), schema_key(schema), tuple(sorted(kwargs.items())))
+    with _lock:
+        entry = _bound_models.get(key)
+        if entry is not None:
+            _bound_models.move_to_end(key)
+            _stats["bind_hits"] += 1
+            return entry[1]
+    bound = _bind(model, compiled, kwargs)
+    with _lock:
+        _stats["bind_misses"] += 1
+        # The model is stored with the bound runnable so its id() cannot be reused while cached
+        entry = _bound_models.setdefault(key, (model, bound))
+        while len(_bound_models) > MAX_BOUND_MODELS:
+            _bound_models.popitem(last=False)
+            _stats["bind_evictions"] += 1
+        return entry[1]
+
+
+def cache_info() -> Dict[str, int]:
+    with _lock:
+        return dict(_stats, schemas=len(_compiled), bound_models=len(_bound_models),
+                    max_bound_models=MAX_BOUND_MODELS)
+
+
+def clear_cache():
+    with _lock:
+        _compiled.clear()
+        _bound_models.clear()
+        for key in _stats:
+            _stats[key] = 0
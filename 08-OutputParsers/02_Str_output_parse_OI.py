@@ -1,10 +1,15 @@
-from langchain_openai import ChatOpenAI
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
+
 load_dotenv()
 
-model = ChatOpenAI()
+model = get_chat_model("openai")
 
 # 1st prompt -> detailed report
 template1 = PromptTemplate(
@@ -1,15 +1,16 @@
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
+
 load_dotenv()
 
-llm = HuggingFaceEndpoint(
-    repo_id="google/gemma-2-2b-it",
-    task="text-generation"
-)
-model = ChatHuggingFace(llm=llm)
+model = get_chat_model("huggingface", repo_id="google/gemma-2-2b-it", task="text-generation")
 parser = JsonOutputParser()
 
 # template = PromptTemplate(
@@ -1,16 +1,18 @@
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
+from json_repair import RepairingOutputParser
+
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
 
 load_dotenv()
 
-llm = HuggingFaceEndpoint(
-    repo_id="google/gemma-2-2b-it",
-    task="text-generation"
-)
-model = ChatHuggingFace(llm=llm)
+model = get_chat_model("huggingface", repo_id="google/gemma-2-2b-it", task="text-generation")
 
 
 class Person(BaseModel):
@@ -26,7 +28,11 @@ template = PromptTemplate(
     partial_variables={'format_instruction': parser.get_format_instructions()}
 )
 
-chain = template | model | parser
+# Malformed JSON (code fences, single quotes, trailing commas, "25 years") is repaired locally first;
+# the model is only re-queried when the local repair cannot satisfy the schema (e.g. age <= 18).
+repairing_parser = RepairingOutputParser(parser=parser, retry_llm=model)
+
+chain = template | model | repairing_parser
 
 # prompt = template.invoke({'place': 'Pakistani'})
 
@@ -34,3 +40,4 @@ chain = template | model | parser
 final_result = chain.invoke({'place': 'Pakistani'})
 
 print(final_result)
+print(repairing_parser.get_stats())
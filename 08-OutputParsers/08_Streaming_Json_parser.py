@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from streaming_json_parser import streaming_json_parser
+
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
+
+load_dotenv()
+
+model = get_chat_model("huggingface", repo_id="google/gemma-2-2b-it", task="text-generation")
+parser = JsonOutputParser()
+
+template = PromptTemplate(
+    template='Give me 5 facts about {topic} \n {format_instruction}',
+    input_variables=['topic'],
+    partial_variables={'format_instruction': parser.get_format_instructions()},
+)
+
+# Same chain as 05_Json_Output_Parser_Chains.py, but every fact is printed as soon as it closes
+# instead of waiting for the last token. The "final" event is validated by the wrapped parser,
+# so the same works with StructuredOutputParser / PydanticOutputParser.
+chain = template | model | streaming_json_parser(parser)
+
+for event in chain.stream({'topic': "AI Revolution"}):
+    if event.kind == "item":
+        print("Fact received:", event.value)
+    elif event.kind == "key":
+        print(f"Key '{event.key}' completed")
+    else:
+        print("Final result:", event.value)
@@ -0,0 +1,230 @@
+import json
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, get_args, get_origin
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import BaseOutputParser
+from pydantic import ConfigDict, Field, PrivateAttr
+
+# Stages tried in order, cheapest first:
+#   1. the wrapped parser as-is
+#   2. local repair (code fences, single quotes, trailing commas, Python literals,
+#      unclosed brackets) + type coercion against the Pydantic schema
+#   3. re-query the LLM with the error (only if a retry_llm was given)
+
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+
+RETRY_PROMPT = (
+    "The following output did not satisfy the required format.\n"
+    "Format instructions:\n{instructions}\n\n"
+    "Output:\n{completion}\n\n"
+    "Error:\n{error}\n\n"
+    "Return ONLY the corrected JSON."
+)
+
+
+# --- 1. Tolerant JSON extraction and repair ---
+def extract_json_block(text: str) -> str:
+    """
+    Returns the JSON part of a completion, dropping code fences and surrounding prose.
+    """
+    fenced = _FENCE_PATTERN.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [pos for pos in (text.find("{"), text.find("[")) if pos != -1]
+    if not starts:
+        return text.strip()
+    start = min(starts)
+    end = max(text.rfind("}"), text.rfind("]"))
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def repair_json_text(text: str) -> str:
+    """
+    Repairs the common ways small models break JSON, in a single pass over the text:
+    single-quoted strings, unquoted keys, trailing commas, True/False/None and missing closing brackets.
+    """
+    text = extract_json_block(text)
+    text = text.replace("“", '"').replace("”", '"').replace("‘", "'").replace("’", "'")
+
+    out: List[str] = []
+    stack: List[str] = []
+    quote = None
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == "\\" and i + 1 < len(text):
+                nxt = text[i + 1]
+                # \' is not a valid JSON escape
+                out.append("'" if nxt == "'" else char + nxt)
+                i += 2
+                continue
+            if char == quote:
+                out.append('"')
+                quote = None
+            elif char == '"':
+                out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+            else:
+                out.append(char)
+        elif char in "\"'":
+            quote = char
+            out.append('"')
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+        elif char in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(char)
+        elif char.isalpha():
+            j = i
+            while j < len(text) and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            rest = text[j:].lstrip()
+            if word not in _PYTHON_LITERALS and rest.startswith(":"):
+                # Unquoted key
+                out.append(f'"{word}"')
+            else:
+                out.append(_PYTHON_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(char)
+        i += 1
+
+    if quote:
+        out.append('"')
+    _strip_trailing_comma(out)
+    out.extend(reversed(stack))
+    return "".join(out)
+
+
+def _strip_trailing_comma(out: List[str]):
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j]
+
+
+# --- 2. Type coercion against the Pydantic schema ---
+def coerce_to_schema(data: Any, pydantic_object) -> Any:
+    """
+    Coerces obviously-typed values the model returned as text, e.g. "age": "25 years" -> 25.
+    Only top-level fields of the schema are touched; Pydantic does the rest.
+    """
+    if pydantic_object is None or not isinstance(data, dict):
+        return data
+    coerced = dict(data)
+    for name, field in pydantic_object.model_fields.items():
+        key = name if name in coerced else field.alias
+        if key not in coerced:
+            continue
+        coerced[key] = _coerce_value(coerced[key], field.annotation)
+    return coerced
+
+
+def _coerce_value(value: Any, annotation) -> Any:
+    # Optional[int] -> int
+    if get_origin(annotation) is not None and type(None) in get_args(annotation):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        annotation = args[0] if len(args) == 1 else annotation
+
+    if isinstance(value, str):
+        if annotation in (int, float):
+            match = _NUMBER_PATTERN.search(value.replace(",", ""))
+            if match:
+                number = float(match.group())
+                return int(number) if annotation is int and number.is_integer() else number
+        elif annotation is bool and value.strip().lower() in ("true", "yes", "1", "false", "no", "0"):
+            return value.strip().lower() in ("true", "yes", "1")
+    elif annotation is str and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    elif get_origin(annotation) is list and isinstance(value, str):
+        return [value]
+    return value
+
+
+# --- 3. Parser wrapper ---
+class RepairingOutputParser(BaseOutputParser[Any]):
+    """
+    Wraps any JSON-based output parser with a local repair stage that runs before
+    the (expensive) retry-with-LLM fallback.
+    stats -> how many outputs parsed directly, were repaired locally, were re-queried or failed.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    parser: Any
+    retry_llm: Optional[Any] = None
+    max_retries: int = 1
+    stats: Counter = Field(default_factory=Counter)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def parse(self, text: str) -> Any:
+        try:
+            result = self.parser.parse(text)
+            self._count("parsed")
+            return result
+        except (OutputParserException, ValueError) as e:
+            error = e
+
+        result = self._try_local_repair(text)
+        if result is not None:
+            self._count("repaired_locally")
+            return result
+
+        completion = text
+        for _ in range(self.max_retries if self.retry_llm is not None else 0):
+            completion = self._requery(completion, error)
+            try:
+                result = self.parser.parse(completion)
+            except (OutputParserException, ValueError) as e:
+                error = e
+                result = self._try_local_repair(completion)
+            if result is not None:
+                self._count("requeried")
+                return result
+
+        self._count("failed")
+        raise error
+
+    def get_format_instructions(self) -> str:
+        return self.parser.get_format_instructions()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {key: self.stats[key] for key in ("parsed", "repaired_locally", "requeried", "failed")}
+
+    @property
+    def _type(self) -> str:
+        return "repairing_output_parser"
+
+    def _try_local_repair(self, text: str) -> Any:
+        try:
+            data = json.loads(repair_json_text(text))
+            data = coerce_to_schema(data, getattr(self.parser, "pydantic_object", None))
+            return self.parser.parse(json.dumps(data))
+        except (OutputParserException, ValueError):
+            return None
+
+    def _requery(self, completion: str, error: Exception) -> str:
+        prompt = RETRY_PROMPT.format(
+            instructions=self.parser.get_format_instructions(),
+            completion=completion,
+            error=error,
+        )
+        response = self.retry_llm.invoke(prompt)
+        return getattr(response, "content", response)
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
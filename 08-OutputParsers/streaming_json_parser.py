@@ -0,0 +1,234 @@
+import json
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional
+
+
+# NOTE: Works with JsonOutputParser, StructuredOutputParser and PydanticOutputParser.
+# The final result is always produced by the wrapped parser, so the schema
+# validation is exactly the same as calling parser.parse(result.content).
+
+class JsonEvent(NamedTuple):
+    """
+    One event emitted while the JSON is still streaming.
+    kind  -> "key" (a top-level key is complete), "item" (an array element is complete) or "final"
+    key   -> the top-level key the event belongs to (None for a top-level array / final)
+    value -> the completed value (or the validated final result for "final")
+    """
+    kind: str
+    key: Optional[str]
+    value: Any
+
+
+def _chunk_text(chunk: Any) -> str:
+    """
+    Returns the text of a streamed chunk (plain str, AIMessageChunk or content blocks).
+    """
+    if isinstance(chunk, str):
+        return chunk
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block if isinstance(block, str) else block.get("text", "")
+            for block in content
+        )
+    return str(content)
+
+
+class IncrementalJsonParser:
+    """
+    Consumes streamed chunks and emits partial results as soon as they are complete.
+    Every character is scanned exactly once, so the cost is linear in the size of the output
+    (re-parsing the whole buffer on every chunk is quadratic).
+    """
+
+    def __init__(self, parser=None):
+        self.parser = parser
+        self._chunks: List[str] = []
+        self._stack: List[str] = []
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._partial: Any = None
+        # Characters of the current top-level member (key: value) or array element
+        self._member: List[str] = []
+        # Characters of the current element of an array nested directly under a top-level key
+        self._item: List[str] = []
+        self._item_key: Optional[str] = None
+
+    @property
+    def partial(self) -> Any:
+        """A copy of the object assembled so far."""
+        if isinstance(self._partial, dict):
+            return dict(self._partial)
+        if isinstance(self._partial, list):
+            return list(self._partial)
+        return self._partial
+
+    def feed(self, chunk: Any) -> List[JsonEvent]:
+        """
+        Feeds one chunk and returns the events completed by it.
+        """
+        text = _chunk_text(chunk)
+        self._chunks.append(text)
+        events = []
+        for char in text:
+            if self._done:
+                break
+            if not self._started:
+                # Skip code fences / prose in front of the JSON
+                if char in "{[":
+                    self._started = True
+                    self._stack.append(char)
+                    self._partial = {} if char == "{" else []
+                continue
+            self._consume(char, events)
+        return events
+
+    def close(self) -> Any:
+        """
+        Validates the full output with the wrapped parser and returns the final result.
+        """
+        if self.parser is not None:
+            return self.parser.parse("".join(self._chunks))
+        if not self._done:
+            raise ValueError("Stream ended before the JSON output was complete.")
+        return self._partial
+
+    # --- Internal scanning helpers ---
+    def _consume(self, char: str, events: List[JsonEvent]):
+        depth = len(self._stack)
+        in_nested_array = depth >= 2 and self._stack[0] == "{" and self._stack[1] == "["
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+            self._append(char, in_nested_array)
+            return
+
+        if char == '"':
+            self._in_string = True
+            self._append(char, in_nested_array)
+        elif char in "{[":
+            if depth == 1 and char == "[" and self._stack[0] == "{":
+                self._start_nested_array()
+                self._member.append(char)
+            else:
+                self._append(char, in_nested_array)
+            self._stack.append(char)
+        elif char in "}]":
+            self._stack.pop()
+            if not self._stack:
+                self._finish_member(events)
+                self._done = True
+                return
+            if depth == 2 and in_nested_array:
+                self._finish_item(events)
+                self._member.append(char)
+            else:
+                self._append(char, in_nested_array)
+        elif char == "," and depth == 1:
+            self._finish_member(events)
+        elif char == "," and depth == 2 and in_nested_array:
+            self._finish_item(events)
+            self._member.append(char)
+        else:
+            self._append(char, in_nested_array)
+
+    def _append(self, char: str, in_nested_array: bool):
+        self._member.append(char)
+        if in_nested_array:
+            self._item.append(char)
+
+    def _start_nested_array(self):
+        member_text = "".join(self._member).strip()
+        try:
+            key, _ = json.JSONDecoder().raw_decode(member_text)
+        except ValueError:
+            key = None
+        self._item_key = key if isinstance(key, str) else None
+        self._item = []
+
+    def _finish_item(self, events: List[JsonEvent]):
+        text = "".join(self._item).strip()
+        self._item = []
+        if not text or self._item_key is None:
+            return
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        self._partial.setdefault(self._item_key, []).append(value)
+        events.append(JsonEvent("item", self._item_key, value))
+
+    def _finish_member(self, events: List[JsonEvent]):
+        text = "".join(self._member).strip()
+        self._member = []
+        self._item_key = None
+        if not text:
+            return
+        try:
+            if isinstance(self._partial, dict):
+                member = json.loads("{" + text + "}")
+            else:
+                member = json.loads(text)
+        except ValueError:
+            # Malformed member: leave it to the wrapped parser in close()
+            return
+        if isinstance(self._partial, dict):
+            for key, value in member.items():
+                self._partial[key] = value
+                events.append(JsonEvent("key", key, value))
+        else:
+            self._partial.append(member)
+            events.append(JsonEvent("item", None, member))
+
+
+def stream_json_events(chunks: Iterable[Any], parser=None) -> Iterator[JsonEvent]:
+    """
+    Turns a stream of model chunks into JsonEvents, ending with a "final" event.
+    """
+    incremental = IncrementalJsonParser(parser)
+    for chunk in chunks:
+        yield from incremental.feed(chunk)
+    yield JsonEvent("final", None, incremental.close())
+
+
+def streaming_json_parser(parser=None):
+    """
+    Wraps the incremental parser as a Runnable, so it can be used as: template | model | streaming_json_parser(parser)
+    Use chain.stream(...) to receive the events as soon as each key / array element closes;
+    chain.invoke(...) returns only the final result, like the wrapped parser would.
+    """
+    from langchain_core.runnables import RunnableGenerator
+
+    class StreamingJsonParser(RunnableGenerator):
+        # RunnableGenerator.invoke() would add up all streamed events (tuples) into one flat tuple
+        def invoke(self, input, config=None, **kwargs):
+            final = None
+            for final in self.stream(input, config, **kwargs):
+                pass
+            return final.value
+
+        async def ainvoke(self, input, config=None, **kwargs):
+            final = None
+            async for final in self.astream(input, config, **kwargs):
+                pass
+            return final.value
+
+    def _transform(chunks):
+        yield from stream_json_events(chunks, parser)
+
+    async def _atransform(chunks):
+        incremental = IncrementalJsonParser(parser)
+        async for chunk in chunks:
+            for event in incremental.feed(chunk):
+                yield event
+        yield JsonEvent("final", None, incremental.close())
+
+    return StreamingJsonParser(_transform, _atransform, name="streaming_json_parser")
@@ -1,8 +1,13 @@
-from langchain_openai import ChatOpenAI
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
+
 load_dotenv()
 
 prompt = PromptTemplate(
@@ -10,7 +15,7 @@ prompt = PromptTemplate(
     input_variables=['topic']
 )
 
-model = ChatOpenAI()
+model = get_chat_model("openai")
 parser = StrOutputParser()
 chain = prompt | model | parser
 
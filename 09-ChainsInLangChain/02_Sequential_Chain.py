@@ -1,7 +1,13 @@
-from langchain_openai import ChatOpenAI
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from chain_tracer import ChainTracer
+
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
 
 load_dotenv()
 
@@ -15,11 +21,14 @@ prompt2 = PromptTemplate(
     input_variables=['text']
 )
 
-model = ChatOpenAI()
+model = get_chat_model("openai")
 parser = StrOutputParser()
 
 chain = prompt1 | model | parser | prompt2 | model | parser
-result = chain.invoke({'topic': 'Agentic AI'})
+# Per-stage timing / tokens; inspect with: python chain_tracer.py chain_traces.jsonl
+tracer = ChainTracer()
+result = chain.invoke({'topic': 'Agentic AI'}, config={'callbacks': [tracer]})
+tracer.export_jsonl('chain_traces.jsonl')
 
 print(result)
 
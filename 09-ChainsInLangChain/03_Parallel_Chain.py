@@ -1,14 +1,18 @@
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableParallel
 
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
+
 load_dotenv()
 
-model1 = ChatOpenAI()
-model2 = ChatAnthropic(model_name='claude-3-7-sonnet-20250219')
+model1 = get_chat_model("openai")
+model2 = get_chat_model("anthropic", model_name='claude-3-7-sonnet-20250219')
 
 prompt1 = PromptTemplate(
     template='Generate short and simple notes from the following text \n {text}',
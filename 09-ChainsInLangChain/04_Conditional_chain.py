@@ -1,5 +1,5 @@
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
@@ -8,9 +8,13 @@ from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 from typing import Literal
 
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
+
 load_dotenv()
 
-model = ChatOpenAI()
+model = get_chat_model("openai")
 parser = StrOutputParser()
 
 
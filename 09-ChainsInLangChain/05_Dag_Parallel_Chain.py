@@ -0,0 +1,64 @@
+import asyncio
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableParallel
+from dag_executor import DagExecutor
+
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
+
+load_dotenv()
+
+model1 = get_chat_model("openai")
+model2 = get_chat_model("anthropic", model_name='claude-3-7-sonnet-20250219')
+
+prompt1 = PromptTemplate(
+    template='Generate short and simple notes from the following text \n {text}',
+    input_variables=['text']
+)
+
+prompt2 = PromptTemplate(
+    template='Generate 5 short question answers from the following text \n {text}',
+    input_variables=['text']
+)
+
+prompt3 = PromptTemplate(
+    template='Merge the provided notes and quiz into a single document \n notes --> {notes} and quiz --> {quiz}',
+    input_variables=['notes', 'quiz']
+)
+
+parser = StrOutputParser()
+parallel_chain = RunnableParallel({
+    'notes': prompt1 | model1 | parser,
+    'quiz': prompt2 | model2 | parser,
+})
+merge_chain = prompt3 | model1 | parser
+
+# Same graph as 03_Parallel_Chain.py, scheduled as a DAG: OpenAI and Anthropic calls of
+# different texts overlap instead of running batch by batch, within per-provider limits.
+executor = DagExecutor.from_parallel(
+    parallel_chain,
+    merge=merge_chain,
+    max_concurrency=8,
+    provider_limits={'openai-chat': 4, 'anthropic-chat': 2},
+)
+
+texts = [
+    "Support vector machines (SVMs) are a set of supervised learning methods used for classification, regression and outliers detection.",
+    "Decision trees are a non-parametric supervised learning method used for classification and regression.",
+    "K-means clustering partitions n observations into k clusters in which each observation belongs to the cluster with the nearest mean.",
+]
+
+
+async def main():
+    # Each branch is printed as soon as it finishes
+    async for index, node, output in executor.astream_nodes([{'text': text} for text in texts]):
+        print(f"[text {index}] {node} finished:\n{output}\n")
+
+
+asyncio.run(main())
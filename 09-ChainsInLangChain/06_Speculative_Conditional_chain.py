@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableLambda
+from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, Field
+from typing import Literal
+from speculative_branch import SpeculativeBranch
+
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
+
+load_dotenv()
+
+model = get_chat_model("openai")
+parser = StrOutputParser()
+
+
+class Feedback(BaseModel):
+    sentiment: Literal['positive', 'negative'] = Field(description='Give the sentiment of the feedback')
+
+
+parser2 = PydanticOutputParser(pydantic_object=Feedback)
+
+prompt1 = PromptTemplate(
+    template='Classify the sentiment of the following feedback text into positive or negative \n {feedback} \n {format_instruction}',
+    input_variables=['feedback'],
+    partial_variables={'format_instruction': parser2.get_format_instructions()},
+)
+
+classifier_chain = prompt1 | model | parser2
+
+prompt2 = PromptTemplate(
+    template='Write an appropriate response to this positive feedback \n {feedback}',
+    input_variables=['feedback'],
+)
+prompt3 = PromptTemplate(
+    template='Write an appropriate response to this negative feedback \n {feedback}',
+    input_variables=['feedback'],
+)
+
+# Same flow as 04_Conditional_chain.py, but the likely response chain starts while the
+# classifier is still running. The losing branch is cancelled once the sentiment is known,
+# and speculation stops after 5000 (estimated) wasted tokens.
+chain = SpeculativeBranch(
+    classifier_chain,
+    branches={
+        'negative': prompt3 | model | parser,
+        'positive': prompt2 | model | parser,
+    },
+    route=lambda x: x.sentiment,
+    default=RunnableLambda(lambda x: "could not find any sentiment"),
+    wasted_token_budget=5000,
+    priors={'negative': 1},
+)
+
+for feedback in ['this is a terrible mobile', 'the battery died after one day', 'I love the camera']:
+    print(chain.invoke({'feedback': feedback}))
+
+print(chain.get_metrics())
@@ -0,0 +1,45 @@
+import asyncio
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from pipelined_chain import PipelinedChain
+
+# Models come from the shared registry in 05-LangChainModels (not an importable package name)
+sys.path.append(str(Path(__file__).resolve().parents[1] / "05-LangChainModels"))
+from provider_factory import get_chat_model
+
+load_dotenv()
+
+prompt1 = PromptTemplate(
+    template='Generate a detail report on {topic}',
+    input_variables=['topic']
+)
+
+prompt2 = PromptTemplate(
+    template='Generate a 5 pointers summary from the following text \n {text}',
+    input_variables=['text']
+)
+
+model = get_chat_model("openai")
+parser = StrOutputParser()
+
+# Same chain as 02_Sequential_Chain.py split into two stages. The summary of a topic starts
+# as soon as its report is ready, while reports for the other topics are still being written.
+chain = PipelinedChain(
+    [prompt1 | model | parser, prompt2 | model | parser],
+    concurrency=4,
+    queue_size=8,
+)
+
+topics = ['Agentic AI', 'Vector Databases', 'Retrieval Augmented Generation', 'Prompt Engineering']
+
+
+async def main():
+    async for index, summary in chain.abatch_as_completed([{'topic': topic} for topic in topics]):
+        print(f"--- {topics[index]} ---\n{summary}\n")
+
+
+asyncio.run(main())
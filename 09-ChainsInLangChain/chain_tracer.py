@@ -0,0 +1,252 @@
+"""
+Per-node timing and token tracing for LangChain chains.
+
+Usage:
+    tracer = ChainTracer()
+    chain.invoke(inputs, config={'callbacks': [tracer]})
+    tracer.export_jsonl('chain_traces.jsonl')      # one span per line
+    tracer.export_otlp('chain_traces.otlp.json')    # OpenTelemetry (OTLP/JSON) spans
+
+CLI (graph annotated with per-node p50 / p95 over all traces in the file):
+    python chain_tracer.py chain_traces.jsonl
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+def _node_name(serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> str:
+    if kwargs.get("name"):
+        return kwargs["name"]
+    if serialized:
+        return serialized.get("name") or (serialized.get("id") or ["unknown"])[-1]
+    return "unknown"
+
+
+def _path_segment(name: str, kwargs: Dict[str, Any]) -> str:
+    """
+    Node name qualified by its position in the parent ("RunnableSequence > ChatOpenAI#2"), so a
+    model or parser used in several steps of a chain gets one graph node per step.
+    """
+    for tag in kwargs.get("tags") or ():
+        if tag.startswith("seq:step:"):
+            return f"{name}#{tag[len('seq:step:'):]}"
+        if tag.startswith("map:key:"):
+            return f"{name}[{tag[len('map:key:'):]}]"
+    return name
+
+
+def _token_usage(response) -> Dict[str, int]:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return {"input_tokens": usage.get("prompt_tokens", 0), "output_tokens": usage.get("completion_tokens", 0)}
+    totals = {"input_tokens": 0, "output_tokens": 0}
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            totals["input_tokens"] += metadata.get("input_tokens", 0)
+            totals["output_tokens"] += metadata.get("output_tokens", 0)
+    return totals
+
+
+class ChainTracer(BaseCallbackHandler):
+    """
+    Records one span per runnable node: wall time, queue time, input/output tokens and retries.
+    Queue time is the gap between the node becoming ready (its parent started, or its previous
+    sibling finished) and the node actually starting.
+    """
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self._open: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    # --- Span bookkeeping ---
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, kind: str, segment: str):
+        now = time.time_ns()
+        with self._lock:
+            parent = self._open.get(parent_run_id) if parent_run_id else None
+            ready = max(parent["start_ns"], parent["last_child_end_ns"]) if parent else now
+            self._open[run_id] = {
+                "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex,
+                "span_id": run_id.hex[:16],
+                "parent_span_id": parent["span_id"] if parent else None,
+                "name": name,
+                "path": f"{parent['path']} > {segment}" if parent else segment,
+                "kind": kind,
+                "start_ns": now,
+                "end_ns": None,
+                "queue_ms": round((now - ready) / 1e6, 3),
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "retries": 0,
+                "status": "ok",
+                "error": None,
+                "last_child_end_ns": 0,
+            }
+
+    def _end(self, run_id: UUID, parent_run_id: Optional[UUID], error: Optional[BaseException] = None, **fields):
+        now = time.time_ns()
+        with self._lock:
+            span = self._open.pop(run_id, None)
+            if span is None:
+                return
+            span.update(fields)
+            span["end_ns"] = now
+            span["wall_ms"] = round((now - span["start_ns"]) / 1e6, 3)
+            if error is not None:
+                span["status"] = "error"
+                span["error"] = repr(error)
+            parent = self._open.get(parent_run_id) if parent_run_id else None
+            if parent:
+                parent["last_child_end_ns"] = max(parent["last_child_end_ns"], now)
+                # Token counts roll up, so the chain span shows the cost of the whole chain
+                parent["input_tokens"] += span["input_tokens"]
+                parent["output_tokens"] += span["output_tokens"]
+            del span["last_child_end_ns"]
+            self.spans.append(span)
+
+    # --- Callback handler hooks ---
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        name = _node_name(serialized, kwargs)
+        self._start(run_id, parent_run_id, name, "chain", _path_segment(name, kwargs))
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id, parent_run_id)
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id, parent_run_id, error=error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        name = _node_name(serialized, kwargs)
+        self._start(run_id, parent_run_id, name, "llm", _path_segment(name, kwargs))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        name = _node_name(serialized, kwargs)
+        self._start(run_id, parent_run_id, name, "llm", _path_segment(name, kwargs))
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id, parent_run_id, **_token_usage(response))
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._end(run_id, parent_run_id, error=error)
+
+    def on_retry(self, retry_state, *, run_id, parent_run_id=None, **kwargs):
+        with self._lock:
+            if run_id in self._open:
+                self._open[run_id]["retries"] += 1
+
+    # --- Export ---
+    def export_jsonl(self, path: str, append: bool = True):
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, "a" if append else "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span) + "\n")
+
+    def export_otlp(self, path: str, service_name: str = "langchain-chains"):
+        """Writes the spans in the OTLP/JSON format accepted by OpenTelemetry collectors."""
+        with self._lock:
+            spans = list(self.spans)
+        otlp_spans = []
+        for span in spans:
+            attributes = {
+                "langchain.kind": span["kind"],
+                "langchain.path": span["path"],
+                "langchain.queue_ms": span["queue_ms"],
+                "llm.input_tokens": span["input_tokens"],
+                "llm.output_tokens": span["output_tokens"],
+                "langchain.retries": span["retries"],
+            }
+            otlp_spans.append({
+                "traceId": span["trace_id"],
+                "spanId": span["span_id"],
+                "parentSpanId": span["parent_span_id"] or "",
+                "name": span["name"],
+                "kind": 1,
+                "startTimeUnixNano": str(span["start_ns"]),
+                "endTimeUnixNano": str(span["end_ns"]),
+                "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+                "status": {"code": 2, "message": span["error"]} if span["status"] == "error" else {"code": 1},
+            })
+        document = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "chain_tracer"}, "spans": otlp_spans}],
+        }]}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# --- CLI: graph annotated with per-node percentiles ---
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+def summarize(spans: List[Dict[str, Any]]) -> "OrderedDict[str, Dict[str, Any]]":
+    """Groups spans by their path in the chain graph, in tree order (children follow their parent)."""
+    nodes: Dict[str, Dict[str, Any]] = {}
+    for span in sorted(spans, key=lambda s: s["start_ns"]):
+        node = nodes.setdefault(span["path"], {"name": span["name"], "wall": [], "queue": [],
+                                               "tokens": 0, "retries": 0, "errors": 0})
+        node["wall"].append(span["wall_ms"])
+        node["queue"].append(span["queue_ms"])
+        node["tokens"] += span["input_tokens"] + span["output_tokens"]
+        node["retries"] += span["retries"]
+        node["errors"] += span["status"] == "error"
+    first_seen = {path: index for index, path in enumerate(nodes)}
+
+    def tree_position(path: str):
+        parts = path.split(" > ")
+        return [first_seen.get(" > ".join(parts[:depth + 1]), -1) for depth in range(len(parts))]
+
+    return OrderedDict((path, nodes[path]) for path in sorted(nodes, key=tree_position))
+
+
+def print_annotated_graph(spans: List[Dict[str, Any]], out=sys.stdout):
+    nodes = summarize(spans)
+    root_total = max((max(n["wall"]) for path, n in nodes.items() if " > " not in path), default=0) or 1
+    print(f"{'node':<50}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'queue p95':>11}{'tokens/run':>12}{'retries':>9}", file=out)
+    for path, node in nodes.items():
+        depth = path.count(" > ")
+        label = ("  " * depth + ("└─ " if depth else "") + path.rsplit(" > ", 1)[-1])[:49]
+        p95 = _percentile(node["wall"], 0.95)
+        hot = "  <-- hot" if depth and p95 >= 0.5 * root_total else ""
+        print(f"{label:<50}{len(node['wall']):>6}{_percentile(node['wall'], 0.5):>10.1f}{p95:>10.1f}"
+              f"{_percentile(node['queue'], 0.95):>11.1f}{node['tokens'] / len(node['wall']):>12.0f}"
+              f"{node['retries']:>9}{hot}", file=out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description="Print a chain graph annotated with per-node p50/p95.")
+    arg_parser.add_argument("trace_file", help="JSONL file written by ChainTracer.export_jsonl()")
+    args = arg_parser.parse_args(argv)
+    with open(args.trace_file, encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+    if not spans:
+        print("No spans found.")
+        return 1
+    print_annotated_graph(spans)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
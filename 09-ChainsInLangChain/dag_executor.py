@@ -0,0 +1,224 @@
+import asyncio
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.config import patch_config
+
+
+# NOTE: Every (input, node) pair is scheduled as soon as its dependencies finish, so a slow
+# provider never holds back the other branches of the batch. Concurrency is bounded per
+# provider and globally. The sync methods run the nodes' own .invoke() on a thread pool, the
+# async ones their .ainvoke() as asyncio tasks; no event loop is created per call.
+
+class DagNode(NamedTuple):
+    name: str
+    runnable: Any
+    deps: Tuple[str, ...]
+    provider: str
+
+
+def detect_provider(runnable) -> str:
+    """
+    Returns the provider of the first chat model found in a chain, e.g. 'openai-chat' or 'anthropic-chat'.
+    """
+    for step in getattr(runnable, "steps", [runnable]):
+        llm_type = getattr(step, "_llm_type", None)
+        if isinstance(llm_type, str):
+            return llm_type
+    return "default"
+
+
+class DagExecutor(Runnable):
+    """
+    Runs a graph of runnables as one Runnable (so it composes with |).
+    Root nodes receive the original input; other nodes receive {dependency_name: output}.
+    invoke / batch return the output of the sink node (a dict of outputs if there are several);
+    stream_nodes / astream_nodes yield every node's output as soon as it finishes.
+    """
+
+    def __init__(self, max_concurrency: int = 16, provider_limits: Optional[Dict[str, int]] = None,
+                 default_provider_limit: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self.provider_limits = dict(provider_limits or {})
+        self.default_provider_limit = default_provider_limit or max_concurrency
+        self.nodes: Dict[str, DagNode] = {}
+
+    def _provider_limit(self, provider: str) -> int:
+        return self.provider_limits.get(provider, self.default_provider_limit)
+
+    def _node_input(self, inputs: List[Any], outputs: Dict[Tuple[int, str], Any], index: int, node: DagNode):
+        if node.deps:
+            return {dep: outputs[(index, dep)] for dep in node.deps}
+        return inputs[index]
+
+    def _ready_dependents(self, outputs: Dict[Tuple[int, str], Any], index: int, name: str) -> List[DagNode]:
+        """Nodes whose last missing dependency was (index, name)."""
+        return [node for node in self.nodes.values()
+                if name in node.deps and all((index, dep) in outputs for dep in node.deps)]
+
+    def add_node(self, name: str, runnable, deps: Sequence[str] = (), provider: Optional[str] = None):
+        """
+        Adds a node. Dependencies must already be added, which keeps the graph acyclic.
+        """
+        if name in self.nodes:
+            raise ValueError(f"Node '{name}' already exists")
+        missing = [dep for dep in deps if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"Unknown dependencies for '{name}': {missing}")
+        self.nodes[name] = DagNode(name, runnable, tuple(deps), provider or detect_provider(runnable))
+        return self
+
+    @classmethod
+    def from_parallel(cls, parallel, merge=None, merge_name: str = "merge", **kwargs):
+        """
+        Builds the DAG of `parallel_chain | merge_chain` (RunnableParallel followed by a merge step).
+        """
+        executor = cls(**kwargs)
+        for name, branch in parallel.steps__.items():
+            executor.add_node(name, branch)
+        if merge is not None:
+            executor.add_node(merge_name, merge, deps=list(parallel.steps__))
+        return executor
+
+    @property
+    def sinks(self) -> List[str]:
+        used = {dep for node in self.nodes.values() for dep in node.deps}
+        return [name for name in self.nodes if name not in used]
+
+    # --- Scheduling: yield (input_index, node_name, output, error) as nodes finish ---
+    # A failed node ends its input: the nodes depending on it are never started.
+    def _run_threaded(self, inputs: List[Any], node_config: Callable[[int, str], Any]) -> Iterator[tuple]:
+        provider_limits = {node.provider: threading.Semaphore(self._provider_limit(node.provider))
+                           for node in self.nodes.values()}
+        outputs: Dict[Tuple[int, str], Any] = {}
+
+        def run_node(index: int, node: DagNode, node_input: Any):
+            with provider_limits[node.provider]:
+                return node.runnable.invoke(node_input, node_config(index, node.name))
+
+        # The pool size is the global limit
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="dag-executor") as pool:
+            pending = {}
+
+            def submit(index: int, node: DagNode):
+                node_input = self._node_input(inputs, outputs, index, node)
+                pending[pool.submit(run_node, index, node, node_input)] = (index, node)
+
+            for index in range(len(inputs)):
+                for node in self.nodes.values():
+                    if not node.deps:
+                        submit(index, node)
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index, node = pending.pop(future)
+                        if future.exception() is not None:
+                            yield index, node.name, None, future.exception()
+                            continue
+                        outputs[(index, node.name)] = future.result()
+                        yield index, node.name, future.result(), None
+                        for dependent in self._ready_dependents(outputs, index, node.name):
+                            submit(index, dependent)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    async def _run_async(self, inputs: List[Any], node_config: Callable[[int, str], Any]) -> AsyncIterator[tuple]:
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        provider_limits = {node.provider: asyncio.Semaphore(self._provider_limit(node.provider))
+                           for node in self.nodes.values()}
+        outputs: Dict[Tuple[int, str], Any] = {}
+        pending: Dict[asyncio.Task, Tuple[int, DagNode]] = {}
+
+        async def run_node(index: int, node: DagNode, node_input: Any):
+            async with provider_limits[node.provider]:
+                async with global_limit:
+                    return await node.runnable.ainvoke(node_input, node_config(index, node.name))
+
+        def submit(index: int, node: DagNode):
+            node_input = self._node_input(inputs, outputs, index, node)
+            pending[asyncio.create_task(run_node(index, node, node_input))] = (index, node)
+
+        for index in range(len(inputs)):
+            for node in self.nodes.values():
+                if not node.deps:
+                    submit(index, node)
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, node = pending.pop(task)
+                    if task.exception() is not None:
+                        yield index, node.name, None, task.exception()
+                        continue
+                    outputs[(index, node.name)] = task.result()
+                    yield index, node.name, task.result(), None
+                    for dependent in self._ready_dependents(outputs, index, node.name):
+                        submit(index, dependent)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    # --- Per-node streaming ---
+    def stream_nodes(self, inputs: List[Any], config=None) -> Iterator[Tuple[int, str, Any]]:
+        """
+        Yields (input_index, node_name, output) for every node as soon as it finishes.
+        """
+        for index, name, output, error in self._run_threaded(inputs, lambda index, name: config):
+            if error is not None:
+                raise error
+            yield index, name, output
+
+    async def astream_nodes(self, inputs: List[Any], config=None) -> AsyncIterator[Tuple[int, str, Any]]:
+        """
+        Yields (input_index, node_name, output) for every node as soon as it finishes.
+        """
+        async for index, name, output, error in self._run_async(inputs, lambda index, name: config):
+            if error is not None:
+                raise error
+            yield index, name, output
+
+    # --- Runnable interface ---
+    @staticmethod
+    def _child_configs(run_manager, config) -> Callable[[int, str], Any]:
+        # Every node is a child run of its input's DAG run, tagged like a RunnableParallel branch
+        return lambda index, name: patch_config(config[index], callbacks=run_manager[index].get_child(f"map:key:{name}"))
+
+    def _sink_outputs(self, inputs: List[Any], events) -> List[Any]:
+        sinks = self.sinks
+        results: List[Dict[str, Any]] = [{} for _ in inputs]
+        errors: List[Optional[Exception]] = [None] * len(inputs)
+        for index, name, output, error in events:
+            if error is not None:
+                errors[index] = errors[index] or error
+            elif name in sinks:
+                results[index][name] = output
+        return [errors[index] or (result[sinks[0]] if len(sinks) == 1 else result)
+                for index, result in enumerate(results)]
+
+    def _batch(self, inputs: List[Any], run_manager, config) -> List[Any]:
+        return self._sink_outputs(inputs, self._run_threaded(inputs, self._child_configs(run_manager, config)))
+
+    async def _abatch(self, inputs: List[Any], run_manager, config) -> List[Any]:
+        events = [event async for event in self._run_async(inputs, self._child_configs(run_manager, config))]
+        return self._sink_outputs(inputs, events)
+
+    def batch(self, inputs: List[Any], config=None, *, return_exceptions: bool = False, **kwargs) -> List[Any]:
+        """
+        Returns, per input, the output of the sink node (or a dict of outputs if there are several sinks).
+        """
+        return self._batch_with_config(self._batch, list(inputs), config, return_exceptions=return_exceptions, **kwargs)
+
+    async def abatch(self, inputs: List[Any], config=None, *, return_exceptions: bool = False, **kwargs) -> List[Any]:
+        return await self._abatch_with_config(self._abatch, list(inputs), config,
+                                              return_exceptions=return_exceptions, **kwargs)
+
+    def invoke(self, input: Any, config=None, **kwargs) -> Any:
+        return self.batch([input], config, **kwargs)[0]
+
+    async def ainvoke(self, input: Any, config=None, **kwargs) -> Any:
+        return (await self.abatch([input], config, **kwargs))[0]
@@ -0,0 +1,202 @@
+import asyncio
+import queue
+import threading
+from typing import Any, AsyncIterator, Callable, Iterator, List, Sequence, Tuple, Union
+
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.config import get_config_list, patch_config
+
+
+# NOTE: Splits a sequential chain into stages connected by bounded queues. Every stage has
+# its own workers, so stage-2 calls for finished inputs run while stage-1 calls for other
+# inputs are still in flight. For N inputs the wall time approaches the slowest stage
+# instead of the sum of all stages. The sync methods run the stages' own .invoke() on worker
+# threads, the async ones their .ainvoke() as asyncio tasks; no event loop is created per call.
+
+_DONE = object()
+
+
+class PipelinedChain(Runnable):
+    """
+    stages      -> runnables executed in order, e.g. [prompt1 | model | parser, prompt2 | model | parser]
+    concurrency -> workers per stage (one int for all stages, or one per stage)
+    queue_size  -> capacity of the queue in front of every stage (back-pressure)
+    batch_as_completed / abatch_as_completed yield (input_index, output) as soon as an input
+    leaves the last stage.
+    """
+
+    def __init__(self, stages: Sequence[Any], concurrency: Union[int, Sequence[int]] = 4, queue_size: int = 8):
+        if not stages:
+            raise ValueError("PipelinedChain needs at least one stage")
+        self.stages = list(stages)
+        if isinstance(concurrency, int):
+            concurrency = [concurrency] * len(self.stages)
+        if len(concurrency) != len(self.stages):
+            raise ValueError("concurrency must have one entry per stage")
+        self.concurrency = list(concurrency)
+        self.queue_size = queue_size
+
+    # --- Pipelines: yield (input_index, output, error) as inputs leave the last stage ---
+    def _run_threaded(self, inputs: List[Any], stage_config: Callable[[int, int], Any]) -> Iterator[tuple]:
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: queue.Queue = queue.Queue()
+        active_workers = list(self.concurrency)
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def put(target: queue.Queue, item) -> bool:
+            # Timeouts let the threads exit when the consumer stops early
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(source: queue.Queue):
+            while not stop.is_set():
+                try:
+                    return source.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            return _DONE
+
+        def feed():
+            for item in enumerate(inputs):
+                if not put(queues[0], item):
+                    return
+            put(queues[0], _DONE)
+
+        def work(stage_index: int):
+            stage = self.stages[stage_index]
+            inbox = queues[stage_index]
+            is_last = stage_index == len(self.stages) - 1
+            while True:
+                item = get(inbox)
+                if item is _DONE:
+                    # Let the other workers of this stage see it, the last one closes the next stage
+                    put(inbox, _DONE)
+                    with lock:
+                        active_workers[stage_index] -= 1
+                        close_next = active_workers[stage_index] == 0 and not is_last
+                    if close_next:
+                        put(queues[stage_index + 1], _DONE)
+                    return
+                index, value = item
+                try:
+                    output = stage.invoke(value, stage_config(index, stage_index))
+                except Exception as e:
+                    results.put((index, None, e))
+                    continue
+                if is_last:
+                    results.put((index, output, None))
+                elif not put(queues[stage_index + 1], (index, output)):
+                    return
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        for stage_index, workers in enumerate(self.concurrency):
+            threads.extend(threading.Thread(target=work, args=(stage_index,), daemon=True) for _ in range(workers))
+        for thread in threads:
+            thread.start()
+        try:
+            for _ in range(len(inputs)):
+                yield results.get()
+        finally:
+            stop.set()
+
+    async def _run_async(self, inputs: List[Any], stage_config: Callable[[int, int], Any]) -> AsyncIterator[tuple]:
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: asyncio.Queue = asyncio.Queue()
+        active_workers = list(self.concurrency)
+
+        async def feed():
+            for item in enumerate(inputs):
+                await queues[0].put(item)
+            await queues[0].put(_DONE)
+
+        async def work(stage_index: int):
+            stage = self.stages[stage_index]
+            inbox = queues[stage_index]
+            is_last = stage_index == len(self.stages) - 1
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    # Let the other workers of this stage see it, the last one closes the next stage
+                    await inbox.put(_DONE)
+                    active_workers[stage_index] -= 1
+                    if active_workers[stage_index] == 0 and not is_last:
+                        await queues[stage_index + 1].put(_DONE)
+                    return
+                index, value = item
+                try:
+                    output = await stage.ainvoke(value, stage_config(index, stage_index))
+                except Exception as e:
+                    await results.put((index, None, e))
+                    continue
+                if is_last:
+                    await results.put((index, output, None))
+                else:
+                    await queues[stage_index + 1].put((index, output))
+
+        tasks = [asyncio.create_task(feed())]
+        for stage_index, workers in enumerate(self.concurrency):
+            tasks.extend(asyncio.create_task(work(stage_index)) for _ in range(workers))
+
+        try:
+            for _ in range(len(inputs)):
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # --- Runnable interface ---
+    @staticmethod
+    def _collect(inputs: List[Any], events) -> List[Any]:
+        outputs: List[Any] = [None] * len(inputs)
+        for index, output, error in events:
+            outputs[index] = output if error is None else error
+        return outputs
+
+    @staticmethod
+    def _child_configs(run_manager, config) -> Callable[[int, int], Any]:
+        # Every stage is a child run of its input's pipeline run, tagged like a RunnableSequence step
+        return lambda index, stage_index: patch_config(
+            config[index], callbacks=run_manager[index].get_child(f"seq:step:{stage_index + 1}"))
+
+    def _batch(self, inputs: List[Any], run_manager, config) -> List[Any]:
+        return self._collect(inputs, self._run_threaded(inputs, self._child_configs(run_manager, config)))
+
+    async def _abatch(self, inputs: List[Any], run_manager, config) -> List[Any]:
+        events = [event async for event in self._run_async(inputs, self._child_configs(run_manager, config))]
+        return self._collect(inputs, events)
+
+    def batch(self, inputs: List[Any], config=None, *, return_exceptions: bool = False, **kwargs) -> List[Any]:
+        return self._batch_with_config(self._batch, list(inputs), config, return_exceptions=return_exceptions, **kwargs)
+
+    async def abatch(self, inputs: List[Any], config=None, *, return_exceptions: bool = False, **kwargs) -> List[Any]:
+        return await self._abatch_with_config(self._abatch, list(inputs), config,
+                                              return_exceptions=return_exceptions, **kwargs)
+
+    def batch_as_completed(self, inputs: Sequence[Any], config=None, *, return_exceptions: bool = False,
+                           **kwargs) -> Iterator[Tuple[int, Any]]:
+        configs = get_config_list(config, len(inputs))
+        for index, output, error in self._run_threaded(list(inputs), lambda index, _: configs[index]):
+            if error is not None and not return_exceptions:
+                raise error
+            yield index, output if error is None else error
+
+    async def abatch_as_completed(self, inputs: Sequence[Any], config=None, *, return_exceptions: bool = False,
+                                  **kwargs) -> AsyncIterator[Tuple[int, Any]]:
+        configs = get_config_list(config, len(inputs))
+        async for index, output, error in self._run_async(list(inputs), lambda index, _: configs[index]):
+            if error is not None and not return_exceptions:
+                raise error
+            yield index, output if error is None else error
+
+    def invoke(self, input: Any, config=None, **kwargs) -> Any:
+        return self.batch([input], config, **kwargs)[0]
+
+    async def ainvoke(self, input: Any, config=None, **kwargs) -> Any:
+        return (await self.abatch([input], config, **kwargs))[0]
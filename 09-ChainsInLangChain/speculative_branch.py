@@ -0,0 +1,209 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from langchain_core.runnables import Runnable
+from langchain_core.runnables.config import patch_config
+
+
+# NOTE: Opt-in replacement for `classifier_chain | RunnableBranch(...)`.
+# The most likely branch(es) start on the ORIGINAL input while the classifier is still
+# running; the losers are cancelled as soon as the classifier resolves. Speculation turns
+# itself off once the wasted-token budget is used up.
+# invoke() runs the speculative branches on worker threads (their own sync .invoke, so no event
+# loop is created per call); a losing branch that already started cannot be interrupted there and
+# finishes in the background. ainvoke() cancels losing branches mid-request.
+
+def estimate_tokens(value: Any) -> int:
+    """Rough token estimate (~4 characters per token), used when no usage metadata is available."""
+    usage = getattr(value, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens", 0)
+    return len(str(value)) // 4 + 1
+
+
+class SpeculativeBranch(Runnable):
+    """
+    classifier -> runnable whose output is passed to route()
+    branches   -> {label: runnable}; each branch receives the original input
+    route      -> maps the classifier output to a label, e.g. lambda x: x.sentiment
+    default    -> runnable called with the classifier output when the label has no branch
+    """
+
+    def __init__(self, classifier, branches: Dict[str, Any], route: Callable[[Any], str], default=None,
+                 max_speculative_branches: int = 1, wasted_token_budget: Optional[int] = None,
+                 priors: Optional[Dict[str, int]] = None, token_counter: Callable[[Any], int] = estimate_tokens):
+        self.classifier = classifier
+        self.branches = branches
+        self.route = route
+        self.default = default
+        self.max_speculative_branches = max_speculative_branches
+        self.wasted_token_budget = wasted_token_budget
+        self.token_counter = token_counter
+        # Observed label frequencies decide which branches are "likely"
+        self.label_counts = Counter(priors or {})
+        self.metrics = Counter()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def likely_labels(self) -> list:
+        ranked = sorted(self.branches, key=lambda label: -self.label_counts[label])
+        return ranked[:self.max_speculative_branches]
+
+    def speculation_enabled(self) -> bool:
+        if self.max_speculative_branches <= 0:
+            return False
+        return self.wasted_token_budget is None or self.metrics["wasted_tokens"] < self.wasted_token_budget
+
+    def invoke(self, input: Any, config=None, **kwargs) -> Any:
+        return self._call_with_config(self._invoke, input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config=None, **kwargs) -> Any:
+        return await self._acall_with_config(self._ainvoke, input, config, **kwargs)
+
+    @staticmethod
+    def _child_config(config, run_manager, key: str):
+        # Tagged like the branches of a RunnableParallel, so traces keep the classifier and branches apart
+        return patch_config(config, callbacks=run_manager.get_child(f"map:key:{key}"))
+
+    def _invoke(self, input_data: Any, run_manager, config) -> Any:
+        started = time.monotonic()
+        finished_at: Dict[str, float] = {}
+
+        def run_branch(label: str):
+            output = self.branches[label].invoke(input_data, self._child_config(config, run_manager, label))
+            finished_at[label] = time.monotonic()
+            return output
+
+        speculative: Dict[str, Future] = {}
+        if self.speculation_enabled():
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(thread_name_prefix="speculative-branch")
+            speculative = {label: self._executor.submit(run_branch, label) for label in self.likely_labels()}
+
+        try:
+            classified = self.classifier.invoke(input_data, self._child_config(config, run_manager, "classifier"))
+        except BaseException:
+            for future in speculative.values():
+                future.cancel()
+            raise
+        classified_at = time.monotonic()
+        label = self.route(classified)
+
+        winner = speculative.pop(label, None)
+        for loser in speculative.values():
+            self._discard_future(loser, input_data)
+        self._record_route(label, bool(speculative) or winner is not None)
+
+        if winner is not None:
+            output = winner.result()
+            self._record_hit(min(classified_at, finished_at[label]) - started)
+            return output
+
+        if label in self.branches:
+            with self._lock:
+                self.metrics["misses"] += 1
+            return self.branches[label].invoke(input_data, self._child_config(config, run_manager, label))
+
+        if self.default is None:
+            raise ValueError(f"No branch for label {label!r}")
+        return self.default.invoke(classified, self._child_config(config, run_manager, "default"))
+
+    async def _ainvoke(self, input_data: Any, run_manager, config) -> Any:
+        started = time.monotonic()
+        finished_at: Dict[str, float] = {}
+
+        async def run_branch(label: str):
+            output = await self.branches[label].ainvoke(input_data, self._child_config(config, run_manager, label))
+            finished_at[label] = time.monotonic()
+            return output
+
+        speculative = {}
+        if self.speculation_enabled():
+            speculative = {label: asyncio.create_task(run_branch(label)) for label in self.likely_labels()}
+
+        try:
+            classified = await self.classifier.ainvoke(input_data, self._child_config(config, run_manager, "classifier"))
+        except BaseException:
+            for task in speculative.values():
+                task.cancel()
+            raise
+        classified_at = time.monotonic()
+        label = self.route(classified)
+
+        winner = speculative.pop(label, None)
+        for loser in speculative.values():
+            self._discard(loser, input_data)
+        self._record_route(label, bool(speculative) or winner is not None)
+
+        if winner is not None:
+            output = await winner
+            self._record_hit(min(classified_at, finished_at[label]) - started)
+            return output
+
+        if label in self.branches:
+            with self._lock:
+                self.metrics["misses"] += 1
+            return await self.branches[label].ainvoke(input_data, self._child_config(config, run_manager, label))
+
+        if self.default is None:
+            raise ValueError(f"No branch for label {label!r}")
+        return await self.default.ainvoke(classified, self._child_config(config, run_manager, "default"))
+
+    def _record_route(self, label: str, speculated: bool):
+        with self._lock:
+            self.metrics["requests"] += 1
+            self.label_counts[label] += 1
+            if speculated:
+                self.metrics["speculated"] += 1
+
+    def _record_hit(self, saved: float):
+        """saved -> how long the winning branch ran in parallel with the classifier (seconds)"""
+        with self._lock:
+            self.metrics["hits"] += 1
+            self.metrics["latency_saved_ms"] += int(saved * 1000)
+
+    def get_metrics(self) -> Dict[str, int]:
+        with self._lock:
+            metrics = {key: self.metrics[key] for key in
+                       ("requests", "speculated", "hits", "misses", "cancelled", "wasted_tokens", "latency_saved_ms")}
+        metrics["speculation_enabled"] = self.speculation_enabled()
+        return metrics
+
+    def _discard(self, task: asyncio.Task, input_data: Any):
+        """
+        Cancels a losing branch and records its (estimated) wasted tokens.
+        A cancelled call has already paid for its prompt; a finished one for prompt + completion.
+        """
+        wasted = self.token_counter(input_data)
+        if not task.done():
+            task.cancel()
+            with self._lock:
+                self.metrics["cancelled"] += 1
+        elif not task.cancelled() and task.exception() is None:
+            wasted += self.token_counter(task.result())
+        with self._lock:
+            self.metrics["wasted_tokens"] += wasted
+
+    def _discard_future(self, future: Future, input_data: Any):
+        """
+        invoke() counterpart of _discard(): a branch that has not started yet is cancelled for free;
+        a running one cannot be interrupted, so its prompt + completion are recorded when it ends.
+        """
+        if future.cancel():
+            with self._lock:
+                self.metrics["cancelled"] += 1
+            return
+
+        def record(done: Future):
+            wasted = self.token_counter(input_data)
+            if done.exception() is None:
+                wasted += self.token_counter(done.result())
+            with self._lock:
+                self.metrics["wasted_tokens"] += wasted
+
+        future.add_done_callback(record)
@@ -1,11 +1,25 @@
 import pandas as pd
 from fuzzywuzzy import fuzz
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+import math
 import os
+from bisect import bisect_right
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from report_sinks import open_sink, frame_columns
 
 
-# NOTE: Requires 'pandas' and 'fuzzywuzzy' libraries.
-# Run: pip install pandas fuzzywuzzy
+# NOTE: Requires 'pandas' and 'fuzzywuzzy' libraries ('openpyxl' to read .xlsx workbooks).
+# Run: pip install pandas fuzzywuzzy openpyxl
+# Parquet / Excel reports additionally need 'pyarrow' / 'xlsxwriter' (see report_sinks.py).
+
+FUZZY_REPORT_COLUMNS = {
+    "Duplicate Type": "string", "Score": "int",
+    "Item A (Row)": "int", "Item A (Value)": "string",
+    "Item B (Row)": "int", "Item B (Value)": "string",
+    "Normalized A": "string", "Normalized B": "string",
+}
+
 
 # --- 1. Fuzzy Matching and Normalization Helpers ---
 def normalize_field(text: str) -> str:
@@ -24,39 +38,221 @@ def normalize_field(text: str) -> str:
     return text
 
 
-def find_fuzzy_duplicates(df: pd.DataFrame, column: str, threshold: int = 90) -> List[Dict[str, Any]]:
+def map_unique_values(series: pd.Series, transform: Callable[[Any], Any]) -> pd.Series:
     """
-    Detects fuzzy/near duplicates in a large column based on a similarity score.
+    Factorize-then-broadcast: transform(uniques) runs once on the distinct values of the
+    column and the results are mapped back to every row through the factorize codes.
+    Missing values come back as NaN / NaT.
     """
-    duplicates = []
-    normalized_values = df[column].apply(normalize_field)
+    codes, uniques = pd.factorize(series)
+    result = pd.Series(transform(uniques)).reindex(codes)
+    result.index = series.index
+    return result
 
-    # Simple nested loop for demonstration; for huge files, consider blocking or LSH
-    for i in range(len(df)):
-        value_i = normalized_values.iloc[i]
-        original_i = df[column].iloc[i]
 
-        if not value_i: continue
+def normalize_column(series: pd.Series) -> pd.Series:
+    """normalize_field() for a whole column, evaluated once per distinct value."""
+    return map_unique_values(series, lambda uniques: [normalize_field(value) for value in uniques]).fillna("")
 
-        for j in range(i + 1, len(df)):
-            value_j = normalized_values.iloc[j]
-            original_j = df[column].iloc[j]
 
-            # Calculate fuzzy ratio after normalization
-            ratio = fuzz.ratio(value_i, value_j)
+def _max_ratio(len_a: int, len_b: int) -> int:
+    # fuzz.ratio is round(100 * 2 * matches / (len_a + len_b)) and matches <= the shorter length
+    return int(round(200 * min(len_a, len_b) / (len_a + len_b)))
+
 
+def similar_value_pairs(values: List[str], start: int, stop: int, threshold: int) -> List[Tuple[int, int, int]]:
+    """
+    Scores values[start:stop] against every later distinct value and returns (u, v, ratio) for
+    the pairs reaching the threshold, ordered by u then v. Values whose lengths alone rule out
+    the threshold are never compared. Runs in a worker process for multi-workbook audits.
+    """
+    by_length: Dict[int, List[int]] = {}
+    for v, value in enumerate(values):
+        if value:
+            by_length.setdefault(len(value), []).append(v)
+    similar = []
+    for u in range(start, stop):
+        value_u = values[u]
+        if not value_u: continue
+        candidates = sorted(
+            v for length, ids in by_length.items() if _max_ratio(len(value_u), length) >= threshold
+            for v in ids[bisect_right(ids, u):])
+        for v in candidates:
+            # Calculate fuzzy ratio after normalization
+            ratio = fuzz.ratio(value_u, values[v])
             if ratio >= threshold:
-                duplicates.append({
-                    "Duplicate Type": "Fuzzy Match",
-                    "Score": ratio,
-                    "Item A (Row)": df.index[i],
-                    "Item A (Value)": original_i,
-                    "Item B (Row)": df.index[j],
-                    "Item B (Value)": original_j,
-                    "Normalized A": value_i,
-                    "Normalized B": value_j
-                })
-    return duplicates
+                similar.append((u, v, ratio))
+    return similar
+
+
+def _scan_spans(n: int, chunks: int) -> List[Tuple[int, int]]:
+    # Value u is compared with the n - u - 1 later values, so the spans hold equal shares of the triangle
+    bounds = sorted({int(n - n * math.sqrt(1 - k / chunks)) for k in range(chunks)} | {n})
+    return list(zip(bounds, bounds[1:]))
+
+
+def iter_fuzzy_duplicates(df: pd.DataFrame, column: str, threshold: int = 90,
+                          normalized: Optional[pd.Series] = None,
+                          pool: Optional[Executor] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Detects fuzzy/near duplicates in a large column based on a similarity score.
+    Pairs are yielded as they are found, so they can be streamed into a report.
+    Scores are computed once per pair of distinct normalized values and then expanded to
+    every pair of rows holding those values (rows with the same normalized value score 100).
+    normalized -> normalize_column(df[column]) if it was already computed
+    pool       -> process pool to split the scan across (pairs still come out in the same order)
+    """
+    normalized_values = normalize_column(df[column]) if normalized is None else normalized
+    codes, uniques = pd.factorize(normalized_values)
+    values = list(uniques)
+    rows_by_value: List[List[int]] = [[] for _ in values]
+    for pos, code in enumerate(codes):
+        rows_by_value[code].append(pos)
+    originals = df[column].tolist()
+
+    def pair(a: int, b: int, ratio: int) -> Dict[str, Any]:
+        a, b = min(a, b), max(a, b)
+        return {
+            "Duplicate Type": "Fuzzy Match",
+            "Score": ratio,
+            "Item A (Row)": df.index[a],
+            "Item A (Value)": originals[a],
+            "Item B (Row)": df.index[b],
+            "Item B (Value)": originals[b],
+            "Normalized A": values[codes[a]],
+            "Normalized B": values[codes[b]]
+        }
+
+    # The scan runs span by span, so pairs stream out as each span finishes (in the pool if given)
+    spans = _scan_spans(len(values), 4 * (os.cpu_count() or 1))
+    scan = map if pool is None else pool.map
+    scored = scan(similar_value_pairs, repeat(values, len(spans)), [start for start, _ in spans],
+                  [stop for _, stop in spans], repeat(threshold, len(spans)))
+
+    for (start, stop), similar in zip(spans, scored):
+        similar_by_value: Dict[int, List[Tuple[int, int]]] = {}
+        for u, v, ratio in similar:
+            similar_by_value.setdefault(u, []).append((v, ratio))
+
+        for u in range(start, stop):
+            if not values[u]: continue
+            rows_u = rows_by_value[u]
+
+            for x, row_a in enumerate(rows_u):
+                for row_b in rows_u[x + 1:]:
+                    yield pair(row_a, row_b, 100)
+
+            for v, ratio in similar_by_value.get(u, ()):
+                for row_a in rows_u:
+                    for row_b in rows_by_value[v]:
+                        yield pair(row_a, row_b, ratio)
+
+
+def find_fuzzy_duplicates(df: pd.DataFrame, column: str, threshold: int = 90) -> List[Dict[str, Any]]:
+    return list(iter_fuzzy_duplicates(df, column, threshold))
+
+
+class UnionFind:
+    """
+    Disjoint sets over row positions 0..n-1 (union by size, path halving).
+    """
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> int:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+
+def cluster_duplicates(df: pd.DataFrame, column: str, fuzzy_pairs: Iterable[Dict[str, Any]],
+                       normalized: Optional[pd.Series] = None,
+                       source_files: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Groups exact and fuzzy duplicates into connected components (transitively: A~B and B~C
+    puts A, B and C in one cluster) and returns one row per cluster.
+    Runs in O(rows + pairs): exact duplicates are linked per value, fuzzy pairs one by one.
+    The canonical value is the most common normalized value of the cluster (earliest row on ties).
+    normalized   -> normalize_column(df[column]) if it was already computed
+    source_files -> file of every row; adds a "Cross File" column for clusters spanning several files
+    """
+    positions = {label: pos for pos, label in enumerate(df.index)}
+    clusters = UnionFind(len(df))
+    exact_linked = [False] * len(df)
+    min_scores: Dict[int, int] = {}
+
+    # Exact duplicates: link every row to the first row with the same value
+    for rows in df.groupby(column, sort=False).indices.values():
+        for pos in rows[1:]:
+            clusters.union(rows[0], pos)
+        if len(rows) > 1:
+            for pos in rows:
+                exact_linked[pos] = True
+
+    # Fuzzy duplicates; the pair stream also reports identical values (score 100), which the
+    # exact stage has already linked, so only pairs with differing values count as fuzzy
+    for pair in fuzzy_pairs:
+        if pair["Item A (Value)"] == pair["Item B (Value)"]:
+            continue
+        a, b = positions[pair["Item A (Row)"]], positions[pair["Item B (Row)"]]
+        clusters.union(a, b)
+        min_scores[a] = min(min_scores.get(a, 100), pair["Score"])
+
+    members: Dict[int, List[int]] = {}
+    for pos in range(len(df)):
+        root = clusters.find(pos)
+        if clusters.size[root] > 1:
+            members.setdefault(root, []).append(pos)
+
+    min_score_per_cluster: Dict[int, int] = {}
+    for pos, score in min_scores.items():
+        root = clusters.find(pos)
+        min_score_per_cluster[root] = min(min_score_per_cluster.get(root, 100), score)
+
+    original_values = df[column].tolist()
+    normalized_values = (normalize_column(df[column]) if normalized is None else normalized).tolist()
+    files = None if source_files is None else source_files.tolist()
+    rows = []
+    for cluster_id, (root, cluster_rows) in enumerate(sorted(members.items(), key=lambda item: item[1][0]), start=1):
+        counts: Dict[str, int] = {}
+        for pos in cluster_rows:
+            counts[normalized_values[pos]] = counts.get(normalized_values[pos], 0) + 1
+        top_count = max(counts.values())
+        canonical = next(pos for pos in cluster_rows if counts[normalized_values[pos]] == top_count)
+        match_types = []
+        if any(exact_linked[pos] for pos in cluster_rows):
+            match_types.append("Exact")
+        if root in min_score_per_cluster:
+            match_types.append("Fuzzy")
+        row = {
+            "Cluster ID": cluster_id,
+            "Size": len(cluster_rows),
+            "Match Types": " + ".join(match_types),
+            "Min Score": min_score_per_cluster.get(root, 100),
+            "Canonical (Row)": df.index[canonical],
+            "Canonical (Value)": original_values[canonical],
+            "Member Rows": ", ".join(str(df.index[pos]) for pos in cluster_rows),
+            "Member Values": ", ".join(str(original_values[pos]) for pos in cluster_rows),
+        }
+        if files is not None:
+            row["Cross File"] = len({files[pos] for pos in cluster_rows}) > 1
+        rows.append(row)
+    columns = ["Cluster ID", "Size", "Match Types", "Min Score", "Canonical (Row)",
+               "Canonical (Value)", "Member Rows", "Member Values"]
+    return pd.DataFrame(rows, columns=columns + ([] if files is None else ["Cross File"]))
 
 
 # --- 2. Proprietary Audit Rule Engine ---
@@ -72,7 +268,8 @@ def apply_proprietary_rules(df: pd.DataFrame) -> pd.DataFrame:
     df.loc[rule_1_mask, 'Violation_Trigger'] += " | R1: High Parcel Value"
 
     # Rule 2: Flag if 'ShipDate' is more than 90 days ago. (Example logic)
-    df['ShipDate'] = pd.to_datetime(df['ShipDate'], errors='coerce')
+    # Dates repeat heavily, so each distinct value is parsed once
+    df['ShipDate'] = map_unique_values(df['ShipDate'], lambda uniques: pd.to_datetime(uniques, errors='coerce'))
     cutoff_date = pd.Timestamp.now() - pd.Timedelta(days=90)
     rule_2_mask = df['ShipDate'] < cutoff_date
     df.loc[rule_2_mask, 'Violation_Trigger'] += " | R2: Aged Shipment"
@@ -86,9 +283,15 @@ def apply_proprietary_rules(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # --- 3. Main Audit Pipeline ---
-def run_excel_audit(file_path: str):
+def write_report(df: pd.DataFrame, report_file: str):
+    with open_sink(report_file, frame_columns(df)) as sink:
+        sink.write_frame(df)
+
+
+def run_excel_audit(file_path: str, report_format: str = "csv"):
     """
     Loads a huge Excel file (simulated) and runs all auditing checks.
+    report_format -> "csv", "parquet" or "xlsx"
     """
     print("--- Phase 3: Starting Excel Audit Engine ---")
 
@@ -106,24 +309,118 @@ def run_excel_audit(file_path: str):
 
     # 1. Exact Duplicates (FileNumber)
     exact_duplicates = df[df.duplicated(subset=['FileNumber'], keep=False)].sort_values(by='FileNumber')
-    exact_report_file = "audit_report_exact_duplicates.csv"
-    exact_duplicates.to_csv(exact_report_file, index=False)
+    exact_report_file = f"audit_report_exact_duplicates.{report_format}"
+    write_report(exact_duplicates, exact_report_file)
     print(f"\n[DONE] Exact Duplicates Report saved to: {exact_report_file}")
 
-    # 2. Fuzzy Duplicates (FileNumber)
-    fuzzy_duplicates_list = find_fuzzy_duplicates(df, 'FileNumber', threshold=90)
-    df_fuzzy = pd.DataFrame(fuzzy_duplicates_list)
-    fuzzy_report_file = "audit_report_fuzzy_duplicates.csv"
-    df_fuzzy.to_csv(fuzzy_report_file, index=False)
+    # 2. Fuzzy Duplicates (FileNumber), streamed into the report and into the clustering stage
+    fuzzy_report_file = f"audit_report_fuzzy_duplicates.{report_format}"
+    with open_sink(fuzzy_report_file, FUZZY_REPORT_COLUMNS) as fuzzy_sink:
+        fuzzy_pairs = fuzzy_sink.tee(iter_fuzzy_duplicates(df, 'FileNumber', threshold=90))
+        df_clusters = cluster_duplicates(df, 'FileNumber', fuzzy_pairs)
     print(f"[DONE] Fuzzy Duplicates Report saved to: {fuzzy_report_file}")
 
+    # 2b. Duplicate Clusters (exact + fuzzy, one row per group)
+    clusters_report_file = f"audit_report_duplicate_clusters.{report_format}"
+    write_report(df_clusters, clusters_report_file)
+    print(f"[DONE] Duplicate Clusters Report saved to: {clusters_report_file} ({len(df_clusters)} clusters)")
+
     # 3. Proprietary Rule Violations
     violations_df = apply_proprietary_rules(df)
-    violations_report_file = "audit_report_violations.csv"
-    violations_df.to_csv(violations_report_file, index=False)
+    violations_report_file = f"audit_report_violations.{report_format}"
+    write_report(violations_df, violations_report_file)
     print(f"[DONE] Proprietary Violations Report saved to: {violations_report_file}")
 
 
+# --- 4. Multi-Workbook Audit (cross-file duplicates) ---
+def load_workbook(file_path: str) -> pd.DataFrame:
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".csv":
+        return pd.read_csv(file_path, dtype={'FileNumber': str})
+    if extension in (".parquet", ".pq"):
+        return pd.read_parquet(file_path)
+    return pd.read_excel(file_path, dtype={'FileNumber': str})
+
+
+def audit_workbook(file_path: str) -> Dict[str, pd.DataFrame]:
+    """
+    Per-file stage of the multi-workbook audit (runs in a worker process): parses the workbook,
+    applies the rules and returns its FileNumber index. Rows are labelled "<file>:<row>", where
+    row is the spreadsheet row number (header = row 1).
+    """
+    df = load_workbook(file_path)
+    df.index = [f"{file_path}:{row + 2}" for row in range(len(df))]
+    violations = apply_proprietary_rules(df.copy())
+    index = pd.DataFrame({
+        'Source': df.index,
+        'SourceFile': file_path,
+        'SourceRow': range(2, len(df) + 2),
+        # Blank cells stay missing (astype(str) alone would turn them into the value "nan")
+        'FileNumber': df['FileNumber'].astype(str).where(df['FileNumber'].notna()),
+        'Normalized': normalize_column(df['FileNumber']),
+    }, index=df.index)
+    violations.insert(0, 'Source', violations.index)
+    return {"index": index, "violations": violations}
+
+
+def _mark_cross_file(pairs: Iterable[Dict[str, Any]], source_files: pd.Series) -> Iterator[Dict[str, Any]]:
+    for pair in pairs:
+        pair["Cross File"] = source_files[pair["Item A (Row)"]] != source_files[pair["Item B (Row)"]]
+        yield pair
+
+
+def run_multi_workbook_audit(file_paths: List[str], report_format: str = "csv", max_workers: int = None,
+                             threshold: int = 90):
+    """
+    Audits many workbooks together: parsing, normalization and rules run per file in a process
+    pool; the per-file FileNumber indexes are then merged to find exact and fuzzy duplicates
+    within and across files, with the fuzzy scan split across the same pool.
+    Reports reference rows as "<file>:<row>".
+    """
+    print(f"--- Phase 3: Starting Multi-Workbook Audit ({len(file_paths)} files) ---")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        audited = list(pool.map(audit_workbook, file_paths))
+        index = pd.concat([result["index"] for result in audited])
+        violations = pd.concat([result["violations"] for result in audited])
+        print(f"Loaded {len(index)} rows from {len(file_paths)} files")
+
+        # 1. Exact Duplicates (FileNumber), flagged when the copies sit in different files; blank
+        #    FileNumbers are not duplicates of each other
+        filled = index[index['Normalized'] != ""]
+        exact_duplicates = filled[filled.duplicated(subset=['FileNumber'], keep=False)].sort_values(
+            by=['FileNumber', 'Source'])
+        exact_duplicates = exact_duplicates.assign(
+            **{"Cross File": exact_duplicates.groupby('FileNumber')['SourceFile'].transform('nunique') > 1})
+        exact_report_file = f"audit_report_consolidated_exact_duplicates.{report_format}"
+        write_report(exact_duplicates.drop(columns=['Normalized']), exact_report_file)
+        print(f"\n[DONE] Consolidated Exact Duplicates Report saved to: {exact_report_file}")
+
+        # 2. Fuzzy Duplicates and clusters over the merged index
+        fuzzy_columns = dict(FUZZY_REPORT_COLUMNS, **{"Item A (Row)": "string", "Item B (Row)": "string",
+                                                     "Cross File": "bool"})
+        fuzzy_report_file = f"audit_report_consolidated_fuzzy_duplicates.{report_format}"
+        with open_sink(fuzzy_report_file, fuzzy_columns) as fuzzy_sink:
+            # The per-file workers already normalized every FileNumber
+            fuzzy_pairs = _mark_cross_file(
+                iter_fuzzy_duplicates(index, 'FileNumber', threshold, index['Normalized'], pool=pool),
+                index['SourceFile'])
+            df_clusters = cluster_duplicates(index, 'FileNumber', fuzzy_sink.tee(fuzzy_pairs), index['Normalized'],
+                                             source_files=index['SourceFile'])
+        print(f"[DONE] Consolidated Fuzzy Duplicates Report saved to: {fuzzy_report_file}")
+
+    clusters_report_file = f"audit_report_consolidated_duplicate_clusters.{report_format}"
+    write_report(df_clusters, clusters_report_file)
+    cross_file = int(df_clusters["Cross File"].sum())
+    print(f"[DONE] Consolidated Duplicate Clusters Report saved to: {clusters_report_file} "
+          f"({len(df_clusters)} clusters, {cross_file} across files)")
+
+    # 3. Proprietary Rule Violations
+    violations_report_file = f"audit_report_consolidated_violations.{report_format}"
+    write_report(violations, violations_report_file)
+    print(f"[DONE] Consolidated Violations Report saved to: {violations_report_file}")
+
+
 if __name__ == "__main__":
     # Simulate the audit on a large Excel file
     # In a real environment, you'd pass the actual file path.
@@ -0,0 +1,56 @@
+import timeit
+
+from nakli_runnables import NakliLLM, NakliPromptTemplate, NakliStrOutputParser, RunnableConnector
+
+# Measures the composition overhead of RunnableConnector against calling the components
+# directly, and compares invoke-in-a-loop with batch and stream.
+# Run: python bench_runnables.py
+
+N = 10_000
+REPEAT = 5
+
+template = NakliPromptTemplate(
+    template='Write a joke about {topic}',
+    input_variables=['topic']
+)
+llm = NakliLLM()
+parser = NakliStrOutputParser()
+chain = RunnableConnector([template, llm, parser])
+
+inputs = [{'topic': f"topic {i}"} for i in range(N)]
+
+
+def direct_calls():
+    for input_data in inputs:
+        parser.invoke(llm.invoke(template.invoke(input_data)))
+
+
+def connector_invoke():
+    for input_data in inputs:
+        chain.invoke(input_data)
+
+
+def connector_batch():
+    chain.batch(inputs)
+
+
+def connector_stream():
+    for input_data in inputs:
+        for _ in chain.stream(input_data):
+            pass
+
+
+def nested_connector_invoke():
+    nested = RunnableConnector([RunnableConnector([template, llm]), parser])
+    for input_data in inputs:
+        nested.invoke(input_data)
+
+
+if __name__ == "__main__":
+    cases = [direct_calls, connector_invoke, nested_connector_invoke, connector_batch, connector_stream]
+    baseline = None
+    print(f"{'case':<26}{'best (ms)':>12}{'us / item':>12}{'vs direct':>12}")
+    for case in cases:
+        best = min(timeit.repeat(case, number=1, repeat=REPEAT))
+        baseline = baseline or best
+        print(f"{case.__name__:<26}{best * 1000:>12.1f}{best / N * 1e6:>12.2f}{best / baseline:>11.2f}x")
@@ -0,0 +1,2 @@
+# Benchmarks for the audit engine and the extraction pipeline.
+# Run from 10-RunnablesInLangChain:  python -m benchmarks.run_benchmarks --help
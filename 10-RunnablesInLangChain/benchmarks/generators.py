@@ -0,0 +1,134 @@
+import json
+import re
+from typing import List
+
+import numpy as np
+import pandas as pd
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+# OCR / typing confusions the audit engine normalizes away (see normalize_field)
+OCR_CONFUSIONS = [("0", "O"), ("1", "I")]
+ITEM_TYPES = ["Ocean", "Parcel", "Air", "Ground"]
+
+
+def _add_ocr_noise(value: str, rng: np.random.Generator) -> str:
+    """One OCR-style corruption: a digit read as a letter, or an inserted separator."""
+    confusions = [(digit, letter) for digit, letter in OCR_CONFUSIONS if digit in value]
+    if confusions and rng.random() < 0.7:
+        digit, letter = confusions[rng.integers(len(confusions))]
+        return value.replace(digit, letter, 1)
+    position = int(rng.integers(1, len(value)))
+    return value[:position] + ("-" if rng.random() < 0.5 else ".") + value[position:]
+
+
+def make_audit_frame(n: int, duplicate_rate: float = 0.1, noise_rate: float = 0.05, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic audit workbook with the columns run_excel_audit expects.
+    duplicate_rate -> share of rows whose FileNumber repeats an earlier row
+    noise_rate     -> share of rows that are OCR-noised copies (fuzzy instead of exact duplicates);
+                      at most duplicate_rate
+    """
+    rng = np.random.default_rng(seed)
+    n_duplicates = int(n * duplicate_rate)
+    n_unique = n - n_duplicates
+    # Unique 7-digit numbers (as strings, like the source workbooks)
+    uniques = (rng.choice(9_000_000, size=n_unique, replace=False) + 1_000_000).astype(str)
+    copies = uniques[rng.integers(0, n_unique, size=n_duplicates)].astype(object)
+    noisy = np.flatnonzero(rng.random(n_duplicates) < noise_rate / max(duplicate_rate, 1e-9))
+    for i in noisy:
+        copies[i] = _add_ocr_noise(copies[i], rng)
+    file_numbers = np.concatenate([uniques.astype(object), copies])
+    rng.shuffle(file_numbers)
+
+    # Ship dates over the last two years; drawn from a pool, as real workbooks repeat dates heavily
+    date_pool = (pd.Timestamp.now().normalize() - pd.to_timedelta(np.arange(730), unit="D")).strftime("%Y-%m-%d")
+    return pd.DataFrame({
+        "FileNumber": file_numbers,
+        "ItemType": np.asarray(ITEM_TYPES, dtype=object)[rng.integers(0, len(ITEM_TYPES), size=n)],
+        "ItemValue": rng.integers(100, 20_000, size=n),
+        "ShipDate": np.asarray(date_pool, dtype=object)[rng.integers(0, len(date_pool), size=n)],
+    })
+
+
+FILLER_LINES = [
+    "Item {k}: Widget model WX-{num} qty {q} @ ${p}.00",
+    "Ship to: {q} Harbor Road, Suite {k}, Port City",
+    "Terms: Net 30. Purchase order PO-{num}. Carrier ref CR-{k}{q}.",
+    "Remit payment to account {num}{q} before the due date.",
+    "Handling and fuel surcharge applied per tariff section {k}.{q}.",
+]
+
+
+def _filler(rng: np.random.Generator, lines: int) -> List[str]:
+    return [FILLER_LINES[rng.integers(len(FILLER_LINES))].format(
+        k=rng.integers(1, 99), q=rng.integers(1, 500), p=rng.integers(5, 900), num=rng.integers(1000, 99999))
+        for _ in range(lines)]
+
+
+def _ocr_jitter(text: str, rng: np.random.Generator, edits: int = 3) -> str:
+    """Re-scan noise: a few characters outside the unit line replaced by look-alikes."""
+    look_alikes = {"o": "0", "l": "1", "e": "c", "S": "5", "a": "o"}
+    chars = list(text)
+    protected = text.find("Unit Number")
+    for _ in range(edits):
+        position = int(rng.integers(len(chars)))
+        if protected <= position < protected + 40:
+            continue
+        chars[position] = look_alikes.get(chars[position], chars[position])
+    return "".join(chars)
+
+
+def make_invoices(n: int, duplicate_unit_rate: float = 0.05, seed: int = 0, pages: int = 0,
+                  resubmission_rate: float = 0.0) -> List[dict]:
+    """
+    Synthetic OCR documents in the format of get_mock_ocr_data(); each also carries its true
+    "unit_number", for accuracy checks.
+    duplicate_unit_rate -> share of invoices that reuse the unit number of an earlier invoice
+    pages               -> pages of line items / addresses (~40 lines each) around the unit number,
+                           as in multi-page OCR output
+    resubmission_rate   -> share of invoices that are re-scans of an earlier invoice (same document,
+                           slightly different OCR noise)
+    """
+    rng = np.random.default_rng(seed)
+    invoices = []
+    units: List[str] = []
+    for i in range(n):
+        if invoices and rng.random() < resubmission_rate:
+            original = invoices[rng.integers(len(invoices))]
+            invoices.append({"filename": f"invoice_{i:07d}.pdf", "ocr_text": _ocr_jitter(original["ocr_text"], rng),
+                             "unit_number": original["unit_number"]})
+            continue
+        if units and rng.random() < duplicate_unit_rate:
+            unit_number = units[rng.integers(len(units))]
+        else:
+            unit_number = f"UNIT-{chr(65 + i % 26)}{i:06d}"
+            units.append(unit_number)
+        total = rng.integers(100, 5000)
+        ocr_text = (f"Shipment ID: {rng.integers(100000, 999999)}. Invoice Date: 2025-10-01. "
+                    f"Customer Ref: XZY-{i % 97}. Unique Unit Number: {unit_number}. Total: ${total}.00.")
+        if pages:
+            lines = _filler(rng, 40 * pages)
+            lines.insert(int(rng.integers(len(lines) + 1)), ocr_text)
+            ocr_text = "\n".join(lines)
+        invoices.append({"filename": f"invoice_{i:07d}.pdf", "ocr_text": ocr_text, "unit_number": unit_number})
+    return invoices
+
+
+_UNIT_PATTERN = re.compile(r"Unit Number:\s*([A-Z0-9-]+)")
+
+
+def _fake_extraction(prompt_value) -> AIMessage:
+    text = prompt_value.to_string()
+    match = _UNIT_PATTERN.search(text)
+    unit = match.group(1) if match else ""
+    return AIMessage(content=json.dumps({
+        "unit_number": unit,
+        "confidence_score": 0.99 if unit else 0.0,
+        "evidence_text": match.group(0) if match else "",
+    }))
+
+
+def fake_extraction_llm():
+    """Stand-in for the chat model in create_unit_extraction_chain(): answers instantly via a regex."""
+    return RunnableLambda(_fake_extraction)
@@ -0,0 +1,194 @@
+"""
+Scaling benchmarks for the audit engine and the extraction pipeline on synthetic data.
+
+Every (case, size) runs in a fresh process, so the peak RSS it reports belongs to that case alone
+(on Linux it also excludes generating the input data).
+Fuzzy detection compares all pairs and the extraction loop invokes a chain per document, so
+those cases are capped by --fuzzy-max-rows / --extraction-max-rows.
+Extraction cases also report their accuracy against the true unit numbers of the synthetic invoices.
+
+Run from 10-RunnablesInLangChain:
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 100000 1000000
+    python -m benchmarks.run_benchmarks --update-baseline   # record the current numbers
+Exits with status 1 when a case is slower than the baseline by more than --tolerance.
+The baseline (benchmarks/baseline.json) is machine-specific: record it on the machine that compares against it.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.generators import fake_extraction_llm, make_audit_frame, make_invoices
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+
+
+# --- Cases: setup(n) builds the input (not timed), run(data) is timed and may return extra metrics ---
+def _normalize(df):
+    from audit_engine import normalize_column
+    normalize_column(df["FileNumber"])
+
+
+def _exact_duplicates(df):
+    df[df.duplicated(subset=["FileNumber"], keep=False)].sort_values(by="FileNumber")
+
+
+def _fuzzy_duplicates(df):
+    from audit_engine import cluster_duplicates, iter_fuzzy_duplicates
+    cluster_duplicates(df, "FileNumber", iter_fuzzy_duplicates(df, "FileNumber", threshold=90))
+
+
+def _rules(df):
+    from audit_engine import apply_proprietary_rules
+    apply_proprietary_rules(df)
+
+
+def _extraction(invoices, **options) -> Dict:
+    from invoice_processor import run_pilot_extraction
+    cwd = os.getcwd()
+    # The pilot summary is printed; its accuracy vs the invoices' true unit numbers is returned instead
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        os.chdir(tmp)  # the reports are written to the working directory
+        try:
+            summary = run_pilot_extraction(invoices, llm=fake_extraction_llm(), **options)
+        finally:
+            os.chdir(cwd)
+    return {"accuracy": summary["accuracy"]}
+
+
+def _report(extension: str) -> Callable:
+    def run(df):
+        from audit_engine import write_report
+        with tempfile.TemporaryDirectory() as tmp:
+            write_report(df, os.path.join(tmp, f"report.{extension}"))
+    return run
+
+
+CASES: Dict[str, tuple] = {
+    "normalize": (make_audit_frame, _normalize),
+    "exact_duplicates": (make_audit_frame, _exact_duplicates),
+    "fuzzy_duplicates": (make_audit_frame, _fuzzy_duplicates),
+    "rules": (make_audit_frame, _rules),
+    "extraction": (partial(make_invoices, pages=3), _extraction),
+    "extraction_trimmed": (partial(make_invoices, pages=3), partial(_extraction, trim_ocr=True)),
+    "extraction_dedup": (partial(make_invoices, pages=3, resubmission_rate=0.2),
+                         partial(_extraction, dedupe_near_duplicates=True)),
+    "report_csv": (make_audit_frame, _report("csv")),
+    "report_parquet": (make_audit_frame, _report("parquet")),
+}
+
+
+def _reset_peak_rss():
+    """Linux: resets the high-water mark, so the peak excludes building the input data."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_case(name: str, n: int) -> Dict:
+    """Runs in a child process."""
+    setup, run = CASES[name]
+    data = setup(n)
+    _reset_peak_rss()
+    start = time.perf_counter()
+    metrics = run(data) or {}
+    seconds = time.perf_counter() - start
+    return {"seconds": round(seconds, 4), "rows_per_s": round(n / seconds), "peak_rss_mb": _peak_rss_mb(),
+            **metrics}
+
+
+def measure(name: str, n: int) -> Dict:
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        try:
+            return pool.submit(run_case, name, n).result()
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    arg_parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    arg_parser.add_argument("--fuzzy-max-rows", type=int, default=2_000)
+    arg_parser.add_argument("--extraction-max-rows", type=int, default=10_000)
+    arg_parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    arg_parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    arg_parser.add_argument("--json", type=Path, default=None, help="Also write the results to this file")
+    args = arg_parser.parse_args(argv)
+
+    limits = {"fuzzy_duplicates": args.fuzzy_max_rows, "extraction": args.extraction_max_rows,
+              "extraction_trimmed": args.extraction_max_rows, "extraction_dedup": args.extraction_max_rows}
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    results: Dict[str, Dict] = {}
+    regressions = []
+
+    print(f"{'case':<20}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'peak RSS MB':>13}{'accuracy':>10}  vs baseline")
+    for name in args.cases:
+        for n in args.sizes:
+            if n > limits.get(name, n):
+                continue
+            key = f"{name}@{n}"
+            result = results[key] = measure(name, n)
+            if "error" in result:
+                print(f"{name:<20}{n:>10}  FAILED: {result['error']}")
+                continue
+            change = ""
+            if key in baseline:
+                ratio = result["seconds"] / baseline[key]["seconds"]
+                change = f"{ratio:.2f}x"
+                if ratio > 1 + args.tolerance:
+                    change += " REGRESSION"
+                    regressions.append(key)
+            accuracy = "" if result.get("accuracy") is None else f"{result['accuracy']:.2%}"
+            print(f"{name:<20}{n:>10}{result['seconds']:>10.3f}{result['rows_per_s']:>12,}"
+                  f"{result['peak_rss_mb'] or float('nan'):>13.1f}{accuracy:>10}  {change}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    if args.update_baseline:
+        measured = {key: result for key, result in results.items() if "error" not in result}
+        args.baseline.write_text(json.dumps({**baseline, **measured}, indent=2, sort_keys=True))
+        print(f"Baseline updated: {args.baseline}")
+    elif not baseline:
+        print("No baseline stored yet; run with --update-baseline to record one.")
+
+    for key in regressions:
+        print(f"REGRESSION: {key} is slower than the baseline by more than {args.tolerance:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,51 @@
 import os
+import re
+import sys
 import json
 import csv
-import pandas as pd
+import time
+from functools import lru_cache
+from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
+from typing import List, Tuple
+from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.callbacks import UsageMetadataCallbackHandler
 from collections import defaultdict
+from report_sinks import open_sink
+from ocr_windows import trim_ocr_text
+from near_duplicates import NearDuplicateIndex
+
+EXTRACTION_REPORT_COLUMNS = {"filename": "string", "unit_number": "string", "confidence": "float", "evidence": "string",
+                             "model": "string", "near_duplicate_of": "string"}
+DUPLICATE_REPORT_COLUMNS = {"unit_number": "string", "occurrence_count": "int", "associated_filenames": "string",
+                            "near_duplicate_copies": "string"}
+
 
 # --- Configuration and Initialization ---
-# NOTE: Replace with your actual API key or set as environment variable.
-if not os.environ.get("OPENAI_API_KEY"):
-    print("WARNING: OPENAI_API_KEY not found. Please set the environment variable.")
-    # In a real environment, we would raise an error here.
+@lru_cache(maxsize=None)
+def get_llm(model: str = "gpt-4o"):
+    """
+    Builds the LLM on first use (GPT-4o for robust structured extraction), so importing this
+    module stays cheap for short-lived batch jobs and serverless handlers.
+    """
+    # NOTE: Replace with your actual API key or set as environment variable.
+    if not os.environ.get("OPENAI_API_KEY"):
+        print("WARNING: OPENAI_API_KEY not found. Please set the environment variable.")
+        # In a real environment, we would raise an error here.
+    # The provider registry lives in 05-LangChainModels (not an importable package name), so its
+    # folder is added to the import path; the client then shares the registry's pooled transport.
+    models_dir = str(Path(__file__).resolve().parents[1] / "05-LangChainModels")
+    if models_dir not in sys.path:
+        sys.path.append(models_dir)
+    from provider_factory import get_chat_model
+    return get_chat_model("openai", model=model, temperature=0.0)
 
-# Initialize the LLM (using GPT-4o for robust structured extraction)
-llm = ChatOpenAI(model="gpt-4o", temperature=0.0)
+
+# Cascade mode: the cheap model answers first, GPT-4o only gets the documents it is unsure about
+CHEAP_MODEL = "gpt-4o-mini"
+# USD per 1M (input, output) tokens, for the cost line of the pilot summary
+MODEL_PRICES_PER_1M_TOKENS = {"gpt-4o-mini": (0.15, 0.60), "gpt-4o": (2.50, 10.00)}
 
 
 # --- 1. Define the Structured Output Schema for Unit Number Extraction ---
@@ -52,6 +81,82 @@ def create_unit_extraction_chain(llm_model):
     return prompt | llm_model | parser
 
 
+class ExtractionTier:
+    """One model of the cascade, with its own call counts, latency and token usage."""
+
+    def __init__(self, name: str, llm_model):
+        self.name = name
+        self.chain = create_unit_extraction_chain(llm_model)
+        self.usage = UsageMetadataCallbackHandler()
+        self.counts = {"calls": 0, "accepted": 0, "escalated": 0}
+        self.seconds = 0.0
+
+    def tokens(self) -> Tuple[int, int]:
+        usage = self.usage.usage_metadata.values()
+        return sum(u.get("input_tokens", 0) for u in usage), sum(u.get("output_tokens", 0) for u in usage)
+
+    def cost(self):
+        prices = MODEL_PRICES_PER_1M_TOKENS.get(self.name)
+        if prices is None:
+            return None
+        input_tokens, output_tokens = self.tokens()
+        return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+
+def passes_checks(data: ExtractedUnitData, ocr_text: str, min_confidence: float) -> bool:
+    """
+    Accepts an extraction when the model is confident and its evidence is consistent: the unit
+    number appears in the evidence, and the evidence appears in the OCR text.
+    """
+    unit = data.unit_number.strip()
+    if not unit or data.confidence_score < min_confidence:
+        return False
+    evidence = " ".join(data.evidence_text.split()).lower()
+    text = " ".join(ocr_text.split()).lower()
+    return unit.lower() in evidence and evidence in text
+
+
+# Unit-like tokens of an OCR text: maximal runs of letters, digits and hyphens, so UNIT-100 and
+# UNIT-1000 are different tokens
+UNIT_TOKEN = re.compile(r"[A-Za-z0-9-]+")
+
+
+def unit_key(unit: str) -> str:
+    """Lookup key of an extracted unit number; empty when it is not a single unit-like token."""
+    unit = unit.strip().upper()
+    return unit if UNIT_TOKEN.fullmatch(unit) else ""
+
+
+def extract_unit(tiers: List[ExtractionTier], ocr_text: str, format_instructions: str,
+                 min_confidence: float) -> Tuple[ExtractedUnitData, ExtractionTier]:
+    """
+    Runs the tiers in order until one passes the checks; the last tier's answer is always kept.
+    Invalid output from an earlier tier also escalates.
+    """
+    for position, tier in enumerate(tiers):
+        last = position == len(tiers) - 1
+        tier.counts["calls"] += 1
+        start = time.perf_counter()
+        try:
+            extracted_data = tier.chain.invoke(
+                {"ocr_text": ocr_text, "format_instructions": format_instructions},
+                config={"callbacks": [tier.usage]},
+            )
+            # Pydantic validation is handled by the parser, but we ensure structure
+            validated_data = ExtractedUnitData.model_validate(extracted_data)
+        except Exception:
+            if last:
+                raise
+            tier.counts["escalated"] += 1
+            continue
+        finally:
+            tier.seconds += time.perf_counter() - start
+        if last or passes_checks(validated_data, ocr_text, min_confidence):
+            tier.counts["accepted"] += 1
+            return validated_data, tier
+        tier.counts["escalated"] += 1
+
+
 # --- 3. Mock OCR Data Source (Simulating the Document AI step) ---
 def get_mock_ocr_data(count=100) -> List[dict]:
     """
@@ -80,88 +185,168 @@ def get_mock_ocr_data(count=100) -> List[dict]:
 
 
 # --- 4. Main Processing and Duplication Reporting ---
-def run_pilot_extraction(ocr_data: List[dict]):
+def run_pilot_extraction(ocr_data: List[dict], llm=None, report_format: str = "csv", cascade: bool = False,
+                         cheap_llm=None, min_confidence: float = 0.85, trim_ocr: bool = False,
+                         token_budget: int = 300, embeddings=None, dedupe_near_duplicates: bool = False,
+                         near_duplicate_index: NearDuplicateIndex = None):
     """
     Runs the extraction chain across all mock OCR data and generates the audit report.
+    Results are streamed into the report as they are produced (report_format: "csv", "parquet" or "xlsx").
+    cascade -> extract with cheap_llm (default gpt-4o-mini) first and escalate to llm (default gpt-4o)
+               only when the confidence / evidence checks fail
+    trim_ocr -> send only the OCR windows most likely to hold the unit number (within token_budget,
+                optionally ranked with embeddings); documents without a unit number are retried with
+                the full text
+    dedupe_near_duplicates -> group near-identical invoices (MinHash, see near_duplicates.py) before
+                extraction; a document reuses the result of an already extracted member of its group
+                when its own text contains that unit number, and is extracted otherwise
+    Documents that carry their true "unit_number" are also scored against it.
+    Returns the pilot summary: processed / successful document counts and the accuracy vs ground
+    truth (0..1, None when no document is labelled).
     """
-    audit_results = []
     unit_counts = defaultdict(list)
-    extraction_chain = create_unit_extraction_chain(llm)
+    successful_extractions = 0
+    ocr_tokens = {"sent": 0, "full": 0, "fallbacks": 0}
+    ground_truth = {"checked": 0, "correct": 0}
+    tiers = [ExtractionTier(getattr(llm, "model_name", None) or "gpt-4o", llm or get_llm())]
+    if cascade:
+        tiers.insert(0, ExtractionTier(getattr(cheap_llm, "model_name", None) or CHEAP_MODEL,
+                                       cheap_llm or get_llm(CHEAP_MODEL)))
+    # The JSON schema of ExtractedUnitData is converted to format instructions once, not per document
+    format_instructions = parser.get_format_instructions()
+
+    # Near-duplicate groups: document index -> group number,
+    # group number -> {unit number: (filename, result, tier) of the first member extracted with it}
+    group_of = {}
+    group_results = defaultdict(dict)
+    propagated = set()
+    if dedupe_near_duplicates:
+        groups = (near_duplicate_index or NearDuplicateIndex()).group([doc["ocr_text"] for doc in ocr_data])
+        group_of = {member: number for number, docs in enumerate(groups) for member in docs}
+
+    def extract(ocr_text: str) -> Tuple[ExtractedUnitData, ExtractionTier]:
+        if not trim_ocr:
+            return extract_unit(tiers, ocr_text, format_instructions, min_confidence)
+        trim = trim_ocr_text(ocr_text, token_budget, embeddings)
+        ocr_tokens["sent"] += trim.tokens
+        ocr_tokens["full"] += trim.full_tokens
+        validated_data, tier = extract_unit(tiers, trim.text, format_instructions, min_confidence)
+        if trim.trimmed and not validated_data.unit_number.strip():
+            # Miss: the windows did not contain the unit number, retry with the full text
+            ocr_tokens["fallbacks"] += 1
+            ocr_tokens["sent"] += trim.full_tokens
+            validated_data, tier = extract_unit(tiers, ocr_text, format_instructions, min_confidence)
+        return validated_data, tier
 
     print("--- Phase 1: Running Pilot Extraction (Simulated) ---")
 
-    for doc in ocr_data:
-        filename = doc["filename"]
-        ocr_text = doc["ocr_text"]
-
-        # Invoke the chain for structured extraction
-        try:
-            extracted_data = extraction_chain.invoke({
-                "ocr_text": ocr_text,
-                "format_instructions": parser.get_format_instructions()
-            })
-
-            # Pydantic validation is handled by the parser, but we ensure structure
-            validated_data = ExtractedUnitData.model_validate(extracted_data)
-
-            unit = validated_data.unit_number.strip()
-            confidence = validated_data.confidence_score
-            evidence = validated_data.evidence_text
-
-            # Store result
-            audit_results.append({
-                "filename": filename,
-                "unit_number": unit,
-                "confidence": confidence,
-                "evidence": evidence
-            })
-
-            # Track unit number occurrences for duplicate report
-            if unit:
-                unit_counts[unit].append(filename)
-
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
-            audit_results.append({
-                "filename": filename,
-                "unit_number": "ERROR",
-                "confidence": 0.0,
-                "evidence": str(e)
-            })
-
-    # Convert results to DataFrame for easy export and analysis
-    df_results = pd.DataFrame(audit_results)
-
     # 1. Output Main CSV/Excel
-    main_output_file = "phase1_extraction_report.csv"
-    df_results.to_csv(main_output_file, index=False)
+    main_output_file = f"phase1_extraction_report.{report_format}"
+    with open_sink(main_output_file, EXTRACTION_REPORT_COLUMNS) as report:
+        for index, doc in enumerate(ocr_data):
+            filename = doc["filename"]
+            ocr_text = doc["ocr_text"]
+            near_duplicate_of = ""
+
+            # Invoke the chain(s) for structured extraction
+            try:
+                group = group_of.get(index)
+                extracted = group_results.get(group)
+                # A member's result is reused only when its unit number occurs as a token of this text
+                reused = next((extracted[token] for token in UNIT_TOKEN.findall(ocr_text.upper())
+                               if token in extracted), None) if extracted else None
+                if reused:
+                    # Resubmitted copy of an already extracted invoice: reuse its result
+                    near_duplicate_of, validated_data, tier = reused
+                    propagated.add(filename)
+                else:
+                    validated_data, tier = extract(ocr_text)
+                    key = unit_key(validated_data.unit_number)
+                    if group is not None and key:
+                        group_results[group].setdefault(key, (filename, validated_data, tier))
+
+                unit = validated_data.unit_number.strip()
+                confidence = validated_data.confidence_score
+                evidence = validated_data.evidence_text
+
+                # Store result
+                report.write({
+                    "filename": filename,
+                    "unit_number": unit,
+                    "confidence": confidence,
+                    "evidence": evidence,
+                    "model": tier.name,
+                    "near_duplicate_of": near_duplicate_of
+                })
+                successful_extractions += 1
+                if "unit_number" in doc:
+                    ground_truth["checked"] += 1
+                    ground_truth["correct"] += unit == doc["unit_number"]
+
+                # Track unit number occurrences for duplicate report
+                if unit:
+                    unit_counts[unit].append(filename)
+
+            except Exception as e:
+                print(f"Error processing {filename}: {e}")
+                report.write({
+                    "filename": filename,
+                    "unit_number": "ERROR",
+                    "confidence": 0.0,
+                    "evidence": str(e),
+                    "model": "",
+                    "near_duplicate_of": ""
+                })
     print(f"\n[DONE] Main Extraction Report saved to: {main_output_file}")
 
     # 2. Duplicate Report Generation
-    duplicate_units_data = [
-        {"unit_number": unit, "occurrence_count": len(files), "associated_filenames": ", ".join(files)}
-        for unit, files in unit_counts.items() if len(files) >= 2
-    ]
-
-    df_duplicates = pd.DataFrame(duplicate_units_data)
-    duplicate_output_file = "phase1_duplicate_unit_report.csv"
-    df_duplicates.to_csv(duplicate_output_file, index=False)
+    duplicate_output_file = f"phase1_duplicate_unit_report.{report_format}"
+    with open_sink(duplicate_output_file, DUPLICATE_REPORT_COLUMNS) as report:
+        # near_duplicate_copies flags the files that are resubmissions of another file of the group
+        report.write_batch(
+            {"unit_number": unit, "occurrence_count": len(files), "associated_filenames": ", ".join(files),
+             "near_duplicate_copies": ", ".join(f for f in files if f in propagated)}
+            for unit, files in unit_counts.items() if len(files) >= 2
+        )
     print(f"[DONE] Duplicate Unit Report saved to: {duplicate_output_file}")
 
     # 3. Accuracy Calculation (Simulated check)
     # Since mock data is perfectly structured, accuracy should be near 100%
     # in a real run, this would be against human-verified ground truth data.
-    successful_extractions = df_results[df_results['unit_number'] != 'ERROR'].shape[0]
     target_accuracy = 98.0
     print(f"\n--- Pilot Summary ---")
     print(f"Total processed documents: {len(ocr_data)}")
     print(f"Successful extractions: {successful_extractions}")
     print(f"Accuracy (Simulated): {successful_extractions / len(ocr_data) * 100:.2f}% (Target: {target_accuracy}%)")
+    if ground_truth["checked"]:
+        print(f"Accuracy vs ground truth: {ground_truth['correct'] / ground_truth['checked'] * 100:.2f}% "
+              f"({ground_truth['checked']} labelled documents)")
+    if trim_ocr:
+        print(f"OCR tokens per document: {ocr_tokens['sent'] / len(ocr_data):.0f} "
+              f"(full text: {ocr_tokens['full'] / len(ocr_data):.0f}), "
+              f"fallbacks to full text: {ocr_tokens['fallbacks']}")
+    if dedupe_near_duplicates:
+        print(f"Near-duplicate groups: {len(set(group_of.values()))} covering {len(group_of)} documents, "
+              f"results reused for {len(propagated)} (extractions saved)")
+
+    print(f"\n{'model':<16}{'calls':>7}{'accepted':>10}{'escalated':>11}{'avg latency':>13}{'tokens in/out':>18}{'cost':>10}")
+    for tier in tiers:
+        input_tokens, output_tokens = tier.tokens()
+        cost = tier.cost()
+        avg_latency = tier.seconds / tier.counts["calls"] if tier.counts["calls"] else 0.0
+        print(f"{tier.name:<16}{tier.counts['calls']:>7}{tier.counts['accepted']:>10}{tier.counts['escalated']:>11}"
+              f"{avg_latency:>12.2f}s{f'{input_tokens}/{output_tokens}':>18}"
+              f"{'n/a' if cost is None else f'${cost:.4f}':>10}")
+
+    return {"processed": len(ocr_data), "successful": successful_extractions,
+            "accuracy": ground_truth["correct"] / ground_truth["checked"] if ground_truth["checked"] else None}
 
 
 if __name__ == "__main__":
     # Simulate processing 100 documents for the pilot phase
     pilot_data = get_mock_ocr_data(count=100)
     run_pilot_extraction(pilot_data)
+    # Cheap model first, GPT-4o only for low-confidence documents:
+    # run_pilot_extraction(pilot_data, cascade=True)
 
     # The structure for Phase 3 (Excel Audit Engine) is in the next file.
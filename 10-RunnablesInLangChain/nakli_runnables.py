@@ -0,0 +1,157 @@
+import asyncio
+import random
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator, List, Optional
+
+
+# The hand-rolled Runnable mini-framework from 02_langchain_mentos.ipynb, with the
+# rest of the LangChain protocol: batch / stream / transform / ainvoke / abatch.
+
+def _add_chunks(left: Any, right: Any) -> Any:
+    """
+    Combines two streamed chunks: strings are concatenated, dicts are merged key by key.
+    """
+    if isinstance(left, dict) and isinstance(right, dict):
+        merged = dict(left)
+        for key, value in right.items():
+            merged[key] = _add_chunks(merged[key], value) if key in merged else value
+        return merged
+    if isinstance(left, str) and isinstance(right, str):
+        return left + right
+    return right
+
+
+class Runnable(ABC):
+
+    @abstractmethod
+    def invoke(self, input_data):
+        pass
+
+    def batch(self, inputs: List[Any], max_concurrency: Optional[int] = None) -> List[Any]:
+        """
+        Default batch: runs invoke() on a thread pool (useful for I/O bound components).
+        """
+        inputs = list(inputs)
+        if len(inputs) <= 1:
+            return [self.invoke(input_data) for input_data in inputs]
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            return list(pool.map(self.invoke, inputs))
+
+    def stream(self, input_data) -> Iterator[Any]:
+        """
+        Default stream: a single chunk with the full output.
+        """
+        yield self.invoke(input_data)
+
+    def transform(self, input_iter: Iterable[Any]) -> Iterator[Any]:
+        """
+        Default transform: waits for the whole input, then streams the output.
+        Components that can work chunk by chunk (e.g. parsers) override this.
+        """
+        final = None
+        got_input = False
+        for chunk in input_iter:
+            final = _add_chunks(final, chunk) if got_input else chunk
+            got_input = True
+        if got_input:
+            yield from self.stream(final)
+
+    async def ainvoke(self, input_data):
+        return await asyncio.to_thread(self.invoke, input_data)
+
+    async def abatch(self, inputs: List[Any], max_concurrency: Optional[int] = None) -> List[Any]:
+        semaphore = asyncio.Semaphore(max_concurrency or max(len(inputs), 1))
+
+        async def run(input_data):
+            async with semaphore:
+                return await self.ainvoke(input_data)
+
+        return list(await asyncio.gather(*(run(input_data) for input_data in inputs)))
+
+
+class NakliLLM(Runnable):
+    response_list = [
+        'AI is great!!!',
+        'Pakistan Zindabad',
+        'Ahmed is learning AI'
+    ]
+
+    def __init__(self):
+        print("LLM Created")
+
+    def invoke(self, prompt):
+        return {'response': random.choice(self.response_list)}
+
+    def predict(self, prompt):
+        return {'response': random.choice(self.response_list)}
+
+    def batch(self, prompts, max_concurrency=None):
+        # Native batch: one call for the whole list, no thread pool needed
+        return [{'response': response} for response in random.choices(self.response_list, k=len(prompts))]
+
+    def stream(self, prompt):
+        # Word by word, like a real streaming LLM
+        words = random.choice(self.response_list).split(' ')
+        for i, word in enumerate(words):
+            yield {'response': word if i == len(words) - 1 else word + ' '}
+
+
+class NakliPromptTemplate(Runnable):
+    def __init__(self, template, input_variables):
+        self.template = template
+        self.input_variables = input_variables
+
+    def invoke(self, input_dict):
+        return self.template.format(**input_dict)
+
+    def format(self, input_dict):
+        return self.template.format(**input_dict)
+
+    def batch(self, input_dicts, max_concurrency=None):
+        template = self.template
+        return [template.format(**input_dict) for input_dict in input_dicts]
+
+
+class NakliStrOutputParser(Runnable):
+
+    def __init__(self):
+        pass
+
+    def invoke(self, input_data):
+        return input_data['response']
+
+    def batch(self, inputs, max_concurrency=None):
+        return [input_data['response'] for input_data in inputs]
+
+    def transform(self, input_iter):
+        # Parses chunk by chunk, so the first token reaches the caller immediately
+        for chunk in input_iter:
+            yield chunk['response']
+
+
+class RunnableConnector(Runnable):
+    def __init__(self, runnable_list):
+        self.runnable_list = runnable_list
+
+    def invoke(self, input_data):
+        for runnable in self.runnable_list:
+            input_data = runnable.invoke(input_data)
+
+        return input_data
+
+    def batch(self, inputs, max_concurrency=None):
+        # Stage by stage, so every component can use its own (native) batch
+        outputs = list(inputs)
+        for runnable in self.runnable_list:
+            outputs = runnable.batch(outputs, max_concurrency=max_concurrency)
+        return outputs
+
+    def stream(self, input_data):
+        yield from self.transform(iter([input_data]))
+
+    def transform(self, input_iter):
+        # Generators are passed through: each stage starts on the first chunk of the previous one
+        for runnable in self.runnable_list:
+            input_iter = runnable.transform(input_iter)
+        yield from input_iter
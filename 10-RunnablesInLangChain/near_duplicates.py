@@ -0,0 +1,112 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+
+# NOTE: Document-level near-duplicate detection for OCR text (resubmitted invoices with slightly
+# different OCR noise). Each text becomes a set of character shingles, summarized by a MinHash
+# signature; LSH banding puts documents that share a band into a bucket, and bucket members are
+# grouped when their estimated Jaccard similarity reaches the threshold. Optionally, an embedding model adds pairs whose cosine
+# similarity is very high. Usage: groups = NearDuplicateIndex(threshold=0.9).group(texts)
+
+_MERSENNE_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """Stable 32-bit hashes of the character shingles of a case- and whitespace-normalized text."""
+    text = re.sub(r"\s+", " ", text.lower()).strip()
+    if len(text) < size:
+        text = text.ljust(size)
+    shingles = {text[i:i + size] for i in range(len(text) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+class NearDuplicateIndex:
+    """
+    threshold     -> minimum estimated Jaccard similarity of two documents' shingle sets
+    num_perm      -> MinHash signature length (= bands * rows per band)
+    bands         -> LSH bands; more bands find more (lower-similarity) candidates
+    embeddings    -> optional LangChain embeddings; pairs with cosine >= embedding_threshold are
+                     grouped as well (catches copies whose OCR text drifted more than the shingles allow)
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, bands: int = 32, shingle_size: int = 5,
+                 embeddings=None, embedding_threshold: float = 0.98, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.embeddings = embeddings
+        self.embedding_threshold = embedding_threshold
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingle_hashes(text, self.shingle_size)
+        # (a * h + b) mod p stays below 2**64 because a, b, h < 2**32
+        return ((self._a * hashes + self._b) % _MERSENNE_PRIME).min(axis=1)
+
+    def _buckets(self, signatures: np.ndarray):
+        """Documents that share a band of their signatures (buckets with at least two members)."""
+        rows = self.num_perm // self.bands
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = defaultdict(list)
+            for doc, signature in enumerate(signatures):
+                buckets[signature[band * rows:(band + 1) * rows].tobytes()].append(doc)
+            yield from (docs for docs in buckets.values() if len(docs) > 1)
+
+    def _embedding_pairs(self, texts: List[str], chunk: int = 1024):
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+        for start in range(0, len(texts), chunk):
+            similarities = vectors[start:start + chunk] @ vectors.T
+            for row, col in zip(*np.nonzero(similarities >= self.embedding_threshold)):
+                if start + row < col:
+                    yield start + row, col
+
+    def group(self, texts: List[str]) -> List[List[int]]:
+        """
+        Groups of near-identical texts (indices in ascending order, so the first member is the
+        earliest document); documents without a near duplicate form no group.
+        """
+        parent = list(range(len(texts)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        signatures = np.array([self.signature(text) for text in texts]) if texts else np.empty((0, self.num_perm))
+        for docs in self._buckets(signatures):
+            # Each member is verified against one representative per group already found in the
+            # bucket, not against every other member: templated invoices share bands, and all
+            # pairs of a large bucket would be quadratic
+            representatives: List[int] = []
+            for doc in docs:
+                for representative in representatives:
+                    if find(doc) == find(representative) or \
+                            np.mean(signatures[doc] == signatures[representative]) >= self.threshold:
+                        parent[find(doc)] = find(representative)
+                        break
+                else:
+                    representatives.append(doc)
+        if self.embeddings is not None and texts:
+            for first, second in self._embedding_pairs(texts):
+                parent[find(second)] = find(first)
+
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for doc in range(len(texts)):
+            groups[find(doc)].append(doc)
+        return sorted((docs for docs in groups.values() if len(docs) > 1), key=lambda docs: docs[0])
+
+
+def group_near_duplicates(texts: List[str], threshold: float = 0.9, embeddings=None) -> List[List[int]]:
+    return NearDuplicateIndex(threshold=threshold, embeddings=embeddings).group(texts)
@@ -0,0 +1,120 @@
+import re
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+
+# NOTE: Shrinks the OCR text sent to the extraction prompt. The text is split into overlapping
+# word windows; each window is scored by unit-number keywords, unit-like patterns and how close
+# they are to each other (optionally blended with embedding similarity), and only the best
+# windows that fit the token budget are kept. When no window looks relevant the full text is used.
+# Usage: trim_ocr_text(ocr_text, token_budget=300).text
+
+KEYWORDS = {"unit number": 5.0, "unit no": 4.0, "unit #": 4.0, "unit": 1.0}
+UNIT_PATTERN = re.compile(r"\bUNIT[-\s]?[A-Z]?\d+\b|\b[A-Z]{1,4}-[A-Z]?\d{3,}\b", re.IGNORECASE)
+PROXIMITY_CHARS = 40
+PROXIMITY_BONUS = 3.0
+EMBEDDING_QUERY = "Unit Number of the invoice"
+
+
+class TrimResult(NamedTuple):
+    text: str
+    tokens: int
+    full_tokens: int
+    trimmed: bool
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English / alphanumeric OCR text)."""
+    return max(1, len(text) // 4)
+
+
+def split_windows(text: str, window_words: int = 60, overlap_words: int = 15) -> List[Tuple[int, int]]:
+    """
+    Character spans (start, end) of overlapping word windows; every span is a substring of text,
+    so evidence quoted from a window can still be found in the full text.
+    """
+    words = [match.span() for match in re.finditer(r"\S+", text)]
+    if not words:
+        return []
+    step = max(1, window_words - overlap_words)
+    spans = []
+    for first in range(0, len(words), step):
+        last = min(first + window_words, len(words)) - 1
+        spans.append((words[first][0], words[last][1]))
+        if last == len(words) - 1:
+            break
+    return spans
+
+
+def keyword_score(window: str) -> float:
+    """
+    Relevance of a window; 0 without a keyword hit. Unit-like patterns alone also match purchase
+    orders, carrier refs etc., so they only add to the score of a window that mentions a unit.
+    """
+    lowered = window.lower()
+    score = 0.0
+    keyword_ends = []
+    for keyword, weight in KEYWORDS.items():
+        for match in re.finditer(re.escape(keyword), lowered):
+            score += weight
+            keyword_ends.append(match.end())
+    if not keyword_ends:
+        return 0.0
+    pattern_starts = [match.start() for match in UNIT_PATTERN.finditer(window)]
+    score += len(pattern_starts)
+    # A unit-like value right after a keyword ("Unit Number: UNIT-A101") is the strongest signal
+    for end in keyword_ends:
+        if any(0 <= start - end <= PROXIMITY_CHARS for start in pattern_starts):
+            score += PROXIMITY_BONUS
+    return score
+
+
+def _embedding_scores(windows: List[str], embeddings) -> np.ndarray:
+    vectors = np.asarray(embeddings.embed_documents(windows), dtype=np.float32)
+    query = np.asarray(embeddings.embed_query(EMBEDDING_QUERY), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+    return vectors @ query / np.where(norms == 0, 1.0, norms)
+
+
+def trim_ocr_text(text: str, token_budget: int = 300, embeddings=None, embedding_weight: float = 5.0,
+                  window_words: int = 60, overlap_words: int = 15) -> TrimResult:
+    """
+    Keeps the most relevant windows of text within token_budget, in document order.
+    embeddings -> optional LangChain embeddings (e.g. a local HuggingFaceEmbeddings); their
+                  similarity to the query is added to the keyword score (scaled by embedding_weight)
+    """
+    full_tokens = estimate_tokens(text)
+    if full_tokens <= token_budget:
+        return TrimResult(text, full_tokens, full_tokens, False)
+
+    spans = split_windows(text, window_words, overlap_words)
+    windows = [text[start:end] for start, end in spans]
+    scores = np.array([keyword_score(window) for window in windows])
+    relevant = scores > 0
+    if not relevant.any():
+        # Miss: no window mentions a unit, so the model gets the full text
+        return TrimResult(text, full_tokens, full_tokens, False)
+    if embeddings is not None:
+        scores = scores + embedding_weight * _embedding_scores(windows, embeddings)
+
+    selected: List[Tuple[int, int]] = []
+    used = 0
+    for index in np.argsort(-scores, kind="stable"):
+        if not relevant[index]:
+            continue
+        cost = estimate_tokens(windows[index])
+        if selected and used + cost > token_budget:
+            continue
+        selected.append(spans[index])
+        used += cost
+
+    # Merge overlapping windows, then join the parts in document order
+    merged: List[List[int]] = []
+    for start, end in sorted(selected):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    trimmed = " ... ".join(text[start:end] for start, end in merged)
+    return TrimResult(trimmed, estimate_tokens(trimmed), full_tokens, True)
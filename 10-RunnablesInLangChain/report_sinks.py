@@ -0,0 +1,217 @@
+import csv
+import math
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+
+# NOTE: Streaming report writers. Records are written in batches as they are produced, so a
+# report never has to be held in memory as a whole. The format is picked from the extension:
+#   .csv            -> CsvSink     (standard library)
+#   .parquet / .pq  -> ParquetSink (pip install pyarrow; typed columns, zstd compression)
+#   .xlsx           -> ExcelSink   (pip install xlsxwriter; constant-memory mode)
+# Columns are declared with a type: "string", "int", "float", "bool" or "datetime".
+# Usage:
+#   with open_sink("report.parquet", {"unit_number": "string", "confidence": "float"}) as sink:
+#       sink.write_batch(records)
+
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def _clean(value: Any) -> Any:
+    """Missing values (None, NaN, NaT) become None."""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class ReportSink:
+    """
+    Base class: subclasses implement _write_rows() and close().
+    """
+
+    def __init__(self, path: str, columns: Dict[str, str], batch_size: int = 10_000):
+        self.path = path
+        self.columns = columns
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer: List[Dict[str, Any]] = []
+
+    def write(self, record: Dict[str, Any]):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_batch(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.write(record)
+
+    def write_frame(self, df: pd.DataFrame):
+        # Records written one by one before this frame go out first, so the file keeps their order
+        self.flush()
+        for start in range(0, len(df), self.batch_size):
+            self._write_rows(df.iloc[start:start + self.batch_size].to_dict("records"))
+
+    def tee(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Writes the records while passing them on, e.g. into the next processing stage."""
+        for record in records:
+            self.write(record)
+            yield record
+
+    def flush(self):
+        if self._buffer:
+            self._write_rows(self._buffer)
+            self._buffer = []
+
+    def _write_rows(self, rows: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvSink(ReportSink):
+    def __init__(self, path: str, columns: Dict[str, str], batch_size: int = 10_000):
+        super().__init__(path, columns, batch_size)
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=list(columns), extrasaction="ignore",
+                                      lineterminator="\n")
+        self._writer.writeheader()
+
+    def _write_rows(self, rows: List[Dict[str, Any]]):
+        self._writer.writerows({name: _clean(row.get(name)) for name in self.columns} for row in rows)
+        self.rows_written += len(rows)
+
+    def close(self):
+        super().close()
+        self._file.close()
+
+
+class ParquetSink(ReportSink):
+    def __init__(self, path: str, columns: Dict[str, str], batch_size: int = 10_000, compression: str = "zstd"):
+        super().__init__(path, columns, batch_size)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64(), "bool": pa.bool_(),
+                 "datetime": pa.timestamp("us")}
+        self._pa = pa
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns.items()])
+        self._writer = pq.ParquetWriter(path, self._schema, compression=compression)
+
+    def _convert(self, name: str, value: Any) -> Any:
+        value = _clean(value)
+        if value is None:
+            return None
+        kind = self.columns[name]
+        if kind == "string":
+            return str(value)
+        if kind == "datetime":
+            return pd.Timestamp(value).to_pydatetime()
+        return value
+
+    def _write_rows(self, rows: List[Dict[str, Any]]):
+        arrays = [
+            self._pa.array([self._convert(name, row.get(name)) for row in rows], type=field.type)
+            for name, field in zip(self.columns, self._schema)
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+        self.rows_written += len(rows)
+
+    def close(self):
+        super().close()
+        self._writer.close()
+
+
+class ExcelSink(ReportSink):
+    """
+    Rows are written straight to disk (xlsxwriter constant_memory); reports longer than an
+    Excel sheet continue on the next sheet.
+    """
+
+    def __init__(self, path: str, columns: Dict[str, str], batch_size: int = 10_000):
+        super().__init__(path, columns, batch_size)
+        import xlsxwriter
+
+        self._workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self._date_format = self._workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+        self._sheet = None
+        self._sheet_row = EXCEL_MAX_ROWS
+
+    def _new_sheet(self):
+        self._sheet = self._workbook.add_worksheet()
+        self._sheet.write_row(0, 0, list(self.columns))
+        self._sheet_row = 1
+
+    def _write_rows(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            if self._sheet_row >= EXCEL_MAX_ROWS:
+                self._new_sheet()
+            for col, (name, kind) in enumerate(self.columns.items()):
+                value = _clean(row.get(name))
+                if value is None:
+                    continue
+                if kind == "datetime":
+                    self._sheet.write_datetime(self._sheet_row, col, pd.Timestamp(value).to_pydatetime(),
+                                               self._date_format)
+                elif kind in ("int", "float"):
+                    self._sheet.write_number(self._sheet_row, col, value)
+                elif kind == "bool":
+                    self._sheet.write_boolean(self._sheet_row, col, bool(value))
+                else:
+                    self._sheet.write_string(self._sheet_row, col, str(value))
+            self._sheet_row += 1
+        self.rows_written += len(rows)
+
+    def close(self):
+        super().close()
+        if self._sheet is None:
+            self._new_sheet()  # header-only report
+        self._workbook.close()
+
+
+SINKS = {
+    ".csv": CsvSink,
+    ".parquet": ParquetSink,
+    ".pq": ParquetSink,
+    ".xlsx": ExcelSink,
+}
+
+
+def open_sink(path: str, columns: Dict[str, str], **options) -> ReportSink:
+    """
+    Opens the sink matching the file extension of path.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Unsupported report format '{extension}'. Available: {sorted(SINKS)}")
+    return SINKS[extension](path, columns, **options)
+
+
+def frame_columns(df: pd.DataFrame, overrides: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Column types of a DataFrame in the form open_sink() expects.
+    """
+    columns = {}
+    for name, dtype in df.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            columns[name] = "bool"
+        elif pd.api.types.is_integer_dtype(dtype):
+            columns[name] = "int"
+        elif pd.api.types.is_float_dtype(dtype):
+            columns[name] = "float"
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            columns[name] = "datetime"
+        else:
+            columns[name] = "string"
+    columns.update(overrides or {})
+    return columns
@@ -0,0 +1,142 @@
+"""
+Startup-time benchmark for the entry points of this repo, based on `python -X importtime`.
+
+- Helper modules (invoice_processor.py, audit_engine.py, ...) are imported as a whole, which
+  also measures any work they do at module level (e.g. building clients).
+- Demo scripts call the APIs at top level, so only their import statements are measured, together
+  with their own sys.path setup (e.g. the benchmarks package adding its parent folder).
+- Entry points in EXCLUDED are not measured (listed with the reason in the output).
+
+Run:  python bench_startup.py [--budget-ms 1500] [--json startup.json] [--strict]
+Exits with status 1 when an entry point exceeds the budget, so it can gate CI.
+"""
+import argparse
+import ast
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent
+SKIP_DIRS = {".git", ".venv", "venv", "__pycache__"}
+# Entry points that are not short-lived jobs, with the reason they are not measured
+EXCLUDED = {
+    "06-PromptsInLangChain/prompt_ui.py": "Streamlit UI (long-running server; streamlit is not in requirements.txt)",
+}
+
+
+def find_entry_points() -> List[Path]:
+    return sorted(
+        path for path in REPO_ROOT.glob("*/**/*.py")
+        if not SKIP_DIRS.intersection(path.relative_to(REPO_ROOT).parts)
+        and path.relative_to(REPO_ROOT).as_posix() not in EXCLUDED
+    )
+
+
+def _is_main_guard(node: ast.stmt) -> bool:
+    return isinstance(node, ast.If) and "__main__" in ast.unparse(node.test)
+
+
+def is_side_effect_free(tree: ast.Module) -> bool:
+    """
+    True for helper modules: their top level only imports, defines and assigns
+    (everything else sits behind `if __name__ == "__main__":`).
+    """
+    for index, node in enumerate(tree.body):
+        if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef,
+                             ast.ClassDef, ast.Assign, ast.AnnAssign)) or _is_main_guard(node):
+            continue
+        if index == 0 and isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            continue  # docstring
+        return False
+    return True
+
+
+def _is_path_setup(node: ast.stmt) -> bool:
+    """`sys.path.insert(...)` / `sys.path.append(...)` at module level."""
+    return (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)
+            and ast.unparse(node.value.func).startswith("sys.path."))
+
+
+def startup_code(path: Path) -> str:
+    """
+    Returns the code whose import time is measured for an entry point.
+    """
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    if path.stem.isidentifier() and is_side_effect_free(tree):
+        return f"import {path.stem}"
+    # Imports and sys.path setup in their original order; __file__ is set for the path setup
+    statements = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)) or _is_path_setup(node)]
+    if not statements:
+        return "pass"
+    return "\n".join([f"__file__ = {str(path)!r}"] + [ast.unparse(node) for node in statements])
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    Parses `-X importtime` output into {top-level module: cumulative microseconds}.
+    """
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line.split("|")
+        # Nested imports are indented; only the modules imported directly by the entry point count
+        name = name[1:]
+        if name and not name.startswith(" "):
+            cumulative[name] = int(cumulative_us)
+    return cumulative
+
+
+def measure(path: Path) -> Dict:
+    code = startup_code(path)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=path.parent, capture_output=True, text=True,
+    )
+    modules = parse_importtime(proc.stderr)
+    result = {
+        "entry_point": str(path.relative_to(REPO_ROOT)),
+        "import_ms": round(sum(modules.values()) / 1000, 1),
+        "heaviest": sorted(modules.items(), key=lambda item: -item[1])[:3],
+        "error": None,
+    }
+    if proc.returncode != 0:
+        result["error"] = proc.stderr.strip().splitlines()[-1]
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--budget-ms", type=float, default=None, help="Fail if an entry point exceeds this")
+    arg_parser.add_argument("--json", type=Path, default=None, help="Also write the results to this file")
+    arg_parser.add_argument("--strict", action="store_true", help="Fail if an entry point cannot be imported")
+    args = arg_parser.parse_args(argv)
+
+    results = [measure(path) for path in find_entry_points()]
+
+    print(f"{'entry point':<62}{'import (ms)':>12}  heaviest modules")
+    for result in sorted(results, key=lambda r: -r["import_ms"]):
+        heaviest = ", ".join(f"{name} {us / 1000:.0f}ms" for name, us in result["heaviest"])
+        suffix = f"  [FAILED: {result['error']}]" if result["error"] else ""
+        print(f"{result['entry_point']:<62}{result['import_ms']:>12.1f}  {heaviest}{suffix}")
+    for entry_point, reason in EXCLUDED.items():
+        print(f"{entry_point:<62}{'skipped':>12}  {reason}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    status = 0
+    if args.budget_ms is not None:
+        over_budget = [r for r in results if r["import_ms"] > args.budget_ms]
+        for result in over_budget:
+            print(f"OVER BUDGET ({args.budget_ms:.0f}ms): {result['entry_point']} {result['import_ms']:.1f}ms")
+        status = 1 if over_budget else status
+    if args.strict and any(r["error"] for r in results):
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())